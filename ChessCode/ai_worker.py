@@ -0,0 +1,167 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Runs the engine in a background thread so the GUI keeps drawing and taking
+# clicks while the computer thinks.  The search works on its own copy of the
+# position; the GUI polls for the move every frame and plays it on the real
+# game once it is ready.
+#
+# While the player thinks, the worker ponders: it guesses the player's reply
+# from the line the engine expects and searches the position after it with
+# no time limit.  If the guess is right the search carries on as the real
+# one, with the clock started when the move is made; if it is wrong the
+# search is dropped, but what it put in the transposition table stays.
+# Positions in the opening book are answered from it straight away.
+import threading
+
+from bitboard import Position
+from book import OpeningBook
+from engine import Engine
+
+
+class AIWorker:
+    """
+    Searches for a move in a background thread, one search at a time
+    Attributes:
+        engine (Engine): search to run
+        move (tuple): move found by the last search that finished, None if
+                      the side to move had no legal move
+        ponder (bool): True to search the expected reply on the player's
+                       time
+        book (OpeningBook): book consulted before searching, None for none
+        ponder_hits (int): player moves that were guessed right
+        ponder_misses (int): player moves that weren't
+    """
+    def __init__(self, engine: Engine, ponder: bool = True,
+                 book: OpeningBook = None) -> None:
+        """
+        Creates an idle worker
+        Parameters:
+            engine (Engine): search to run, only used from the worker's
+                             thread while it is thinking
+            ponder (bool): True to think on the player's time
+            book (OpeningBook): book consulted before searching
+        """
+        self.engine = engine
+        self.move = None
+        self.ponder = ponder
+        self.book = book
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self._thread = None
+        self._stop = None
+        self._ready = False
+        # Hash of the position being pondered, None when not pondering
+        self._pondering = None
+
+    @property
+    def thinking(self) -> bool:
+        """
+        Returns:
+            (bool): True while a search is running
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, position: Position) -> None:
+        """
+        Starts searching a position, stopping any search still running.  A
+        book move is ready at once, with no search
+        Parameters:
+            position (Position): position to search, copied so the caller
+                                 can keep changing it
+        """
+        self.cancel()
+        move = self.book.choose(position) if self.book is not None else None
+        if move is not None:
+            self.move = move
+            self._ready = True
+            return
+        self._launch(position.copy(), False)
+
+    def start_pondering(self, position: Position) -> None:
+        """
+        Starts searching the position after the player's most likely
+        reply, if the table has one
+        Parameters:
+            position (Position): position with the player to move
+        """
+        self.cancel()
+        if not self.ponder:
+            return
+        line = self.engine.principal_variation(position, 1)
+        if not line:
+            return
+        position = position.copy()
+        position.make(*line[0])
+        self._launch(position, True)
+
+    def reply(self, position: Position) -> None:
+        """
+        Starts thinking about the player's move.  If it is the one being
+        pondered, that search just goes on with its clock started
+        Parameters:
+            position (Position): position after the player's move
+        """
+        if self._pondering is not None and self._pondering == position.hash:
+            self._pondering = None
+            self.ponder_hits += 1
+            self.engine.ponder_hit()
+            return
+        if self._pondering is not None:
+            self.ponder_misses += 1
+        self.start(position)
+
+    def _launch(self, position: Position, ponder: bool) -> None:
+        """
+        Starts the worker thread
+        Parameters:
+            position (Position): position to search, owned by the thread
+            ponder (bool): True to search without a time limit
+        """
+        self._stop = threading.Event()
+        self._ready = False
+        self._pondering = position.hash if ponder else None
+        self._thread = threading.Thread(target=self._run, args=(position, self._stop, ponder),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, position: Position, stop: threading.Event, ponder: bool) -> None:
+        """
+        Body of the worker thread
+        Parameters:
+            position (Position): position to search
+            stop (Event): set when the search is cancelled
+            ponder (bool): True to search without a time limit
+        """
+        move = self.engine.search(position, stop, ponder)
+        if not stop.is_set():
+            self.move = move
+            self._ready = True
+
+    def done(self) -> bool:
+        """
+        Polled by the GUI to find out if the move is ready.  Only answers
+        True once per search, and not for a pondering search until the
+        player makes the move it guessed
+        Returns:
+            (bool): True if a search has finished and move holds its move
+        """
+        if self._ready and self._pondering is None:
+            self._ready = False
+            return True
+        return False
+
+    def cancel(self) -> None:
+        """
+        Stops the running search or pondering, if any, and throws its move
+        away.  Waits for the thread to end, which happens within a thousand
+        nodes, so the engine is free for the next search
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._ready = False
+        self._pondering = None
@@ -0,0 +1,859 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Bitboard position core.  A position is twelve 64 bit integers, one for
+# each kind and color of piece, with bit y * 8 + x set when that piece is on
+# row y, column x.  Row 0 is black's back row, the same as Game._board, so
+# square y * 8 + x is Game._board[y][x].  Attacks and moves are worked out
+# with precomputed masks and bit operations instead of walking the board one
+# square at a time.  Castling and en passant are not part of the game, and
+# pawns always promote to a queen.
+import random
+
+WHITE = 0
+BLACK = 1
+
+PAWN = 0
+KNIGHT = 1
+BISHOP = 2
+ROOK = 3
+QUEEN = 4
+KING = 5
+
+# Letters for each kind, as used in FEN
+NAMES = 'pnbrqk'
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+
+# (row change, column change) of each direction.  The first four go to
+# higher squares and the last four to lower ones, which decides whether the
+# closest blocker on a ray is its lowest or highest bit
+DIRECTIONS = [(0, 1), (1, -1), (1, 0), (1, 1), (0, -1), (-1, 1), (-1, 0), (-1, -1)]
+ORTHOGONAL = (0, 2, 4, 6)
+DIAGONAL = (1, 3, 5, 7)
+# Directions each kind of piece slides in, None for pieces that don't slide
+SLIDES = (None, None, DIAGONAL, ORTHOGONAL, tuple(range(8)), None)
+
+
+def _masks(offsets: list) -> list:
+    """
+    Builds a bitboard for every square of the squares at the given offsets
+    that are still on the board
+    Parameters:
+        offsets (list): (row change, column change) tuples
+    Returns:
+        (list): 64 bitboards, one per square
+    """
+    masks = []
+    for square in range(64):
+        y, x = divmod(square, 8)
+        mask = 0
+        for dy, dx in offsets:
+            if 0 <= y + dy < 8 and 0 <= x + dx < 8:
+                mask |= 1 << ((y + dy) * 8 + x + dx)
+        masks.append(mask)
+    return masks
+
+
+def _rays(dy: int, dx: int) -> list:
+    """
+    Builds a bitboard for every square of all the squares in one direction
+    up to the edge of the board
+    Parameters:
+        dy (int): row change of the direction
+        dx (int): column change of the direction
+    Returns:
+        (list): 64 bitboards, one per square
+    """
+    rays = []
+    for square in range(64):
+        y, x = divmod(square, 8)
+        ray = 0
+        y, x = y + dy, x + dx
+        while 0 <= y < 8 and 0 <= x < 8:
+            ray |= 1 << (y * 8 + x)
+            y, x = y + dy, x + dx
+        rays.append(ray)
+    return rays
+
+
+KNIGHT_ATTACKS = _masks([(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                         (1, -2), (1, 2), (2, -1), (2, 1)])
+KING_ATTACKS = _masks(DIRECTIONS)
+# White pawns move up the board (to lower rows), black pawns down
+PAWN_ATTACKS = [_masks([(-1, -1), (-1, 1)]), _masks([(1, -1), (1, 1)])]
+RAYS = [_rays(dy, dx) for dy, dx in DIRECTIONS]
+# Every square a queen on an empty board could reach from each square, the
+# only places a sliding piece that sees the square can be
+LINES = [sum(RAYS[direction][square] for direction in range(8)) for square in range(64)]
+# Every square on the board
+FULL = (1 << 64) - 1
+# Row each color's pawns start on and the row they promote on
+PAWN_START = (6, 1)
+PROMOTION_ROW = (0, 7)
+
+# Random keys for Zobrist hashing: one for each piece on each square and one
+# for black to move.  The seed is fixed so a position hashes the same way
+# every run
+_keys = random.Random(163)
+ZOBRIST = [[_keys.getrandbits(64) for _ in range(64)] for _ in range(12)]
+SIDE_KEY = _keys.getrandbits(64)
+
+
+def squares(bitboard: int) -> list:
+    """
+    Lists the squares set in a bitboard, lowest first
+    Parameters:
+        bitboard (int): bitboard to look through
+    Returns:
+        (list): square numbers
+    """
+    found = []
+    while bitboard:
+        low = bitboard & -bitboard
+        found.append(low.bit_length() - 1)
+        bitboard ^= low
+    return found
+
+
+def _between() -> list:
+    """
+    Builds the table of squares strictly between two squares on the same
+    row, column or diagonal
+    Returns:
+        (list): 64 x 64 list of bitboards, 0 for squares that aren't lined
+                up
+    """
+    table = [[0] * 64 for _ in range(64)]
+    for square in range(64):
+        for direction in range(8):
+            ray = RAYS[direction][square]
+            for target in squares(ray):
+                # Direction ^ 4 is the opposite direction
+                table[square][target] = ray & RAYS[direction ^ 4][target]
+    return table
+
+
+BETWEEN = _between()
+
+
+def square_name(square: int) -> str:
+    """
+    Parameters:
+        square (int): square number y * 8 + x
+    Returns:
+        (str): the square in chess notation, a8 for square 0
+    """
+    return 'abcdefgh'[square & 7] + str(8 - (square >> 3))
+
+
+def move_name(move: tuple) -> str:
+    """
+    Parameters:
+        move (tuple): (from square, to square)
+    Returns:
+        (str): the move in coordinate notation, like e2e4
+    """
+    return square_name(move[0]) + square_name(move[1])
+
+
+def parse_move(text: str) -> tuple:
+    """
+    Reads a move written the way move_name writes it
+    Parameters:
+        text (str): move in coordinate notation, like e2e4
+    Returns:
+        (tuple): (from square, to square)
+    Raises:
+        ValueError: if it isn't two squares
+    """
+    if len(text) != 4 or text[0] not in 'abcdefgh' or text[2] not in 'abcdefgh' or \
+            text[1] not in '12345678' or text[3] not in '12345678':
+        raise ValueError('Bad move ' + text)
+    return ((8 - int(text[1])) * 8 + 'abcdefgh'.index(text[0]),
+            (8 - int(text[3])) * 8 + 'abcdefgh'.index(text[2]))
+
+
+def _slide(square: int, occupied: int, directions: tuple) -> int:
+    """
+    Gets the squares a sliding piece attacks, stopping each ray at the
+    first piece in the way
+    Parameters:
+        square (int): square the piece is on
+        occupied (int): bitboard of every piece on the board
+        directions (tuple): indexes into DIRECTIONS the piece slides along
+    Returns:
+        (int): bitboard of attacked squares, including the blockers
+    """
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            if direction < 4:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            # Everything past the first blocker is hidden behind it
+            ray ^= RAYS[direction][first]
+        attacks |= ray
+    return attacks
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+    """
+    Parameters:
+        square (int): square the bishop is on
+        occupied (int): bitboard of every piece on the board
+    Returns:
+        (int): bitboard of the squares a bishop there attacks
+    """
+    return _slide(square, occupied, DIAGONAL)
+
+
+def rook_attacks(square: int, occupied: int) -> int:
+    """
+    Parameters:
+        square (int): square the rook is on
+        occupied (int): bitboard of every piece on the board
+    Returns:
+        (int): bitboard of the squares a rook there attacks
+    """
+    return _slide(square, occupied, ORTHOGONAL)
+
+
+class Position:
+    """
+    A chess position stored as bitboards
+    Attributes:
+        pieces (list): 12 bitboards, index color * 6 + kind
+        occupied (list): bitboards of every white and every black piece
+        all (int): bitboard of every piece
+        mailbox (list): color * 6 + kind of the piece on each square, None
+                        for an empty square
+        side (int): WHITE or BLACK, whose move it is
+        hash (int): Zobrist hash of the pieces and the side to move, kept
+                    up to date as pieces move
+        attacks_from (list): bitboard of the squares the piece on each
+                             square attacks, 0 for an empty square.  Only
+                             the pieces a move touches are worked out again
+        attack_counts (list): for each color, how many of its pieces attack
+                              each square, kept up to date with attacks_from
+        piece_squares (list): set of the squares each color's pieces are on
+        kings (list): square of each color's king, None if it has none
+        debug (bool): class wide, True to have make and unmake check every
+                      index against the pieces after each move
+    """
+    __slots__ = ('pieces', 'occupied', 'all', 'mailbox', 'side', 'hash',
+                 'attacks_from', 'attack_counts', 'piece_squares', 'kings')
+    debug = False
+
+    def __init__(self) -> None:
+        """
+        Creates an empty position with white to move
+        """
+        self.pieces = [0] * 12
+        self.occupied = [0, 0]
+        self.all = 0
+        self.mailbox = [None] * 64
+        self.side = WHITE
+        self.hash = 0
+        self.attacks_from = [0] * 64
+        self.attack_counts = [[0] * 64, [0] * 64]
+        self.piece_squares = [set(), set()]
+        self.kings = [None, None]
+
+    @classmethod
+    def start(cls):
+        """
+        Returns:
+            (Position): the starting position of a game
+        """
+        position = cls()
+        back_row = [ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK]
+        for x, kind in enumerate(back_row):
+            position.put(x, BLACK, kind)
+            position.put(8 + x, BLACK, PAWN)
+            position.put(48 + x, WHITE, PAWN)
+            position.put(56 + x, WHITE, kind)
+        return position
+
+    @classmethod
+    def from_fen(cls, fen: str):
+        """
+        Reads a position from FEN.  Only the pieces and the side to move
+        are used, since there is no castling or en passant
+        Parameters:
+            fen (str): position in Forsyth-Edwards Notation
+        Returns:
+            (Position): the position
+        Raises:
+            ValueError: if the piece placement isn't 8 rows of 8 squares
+        """
+        fields = fen.split()
+        rows = fields[0].split('/') if fields else []
+        if len(rows) != 8:
+            raise ValueError('FEN needs 8 rows of pieces: ' + fen)
+        position = cls()
+        for y, row in enumerate(rows):
+            x = 0
+            for char in row:
+                if char.isdigit():
+                    x += int(char)
+                elif char.lower() in NAMES and x < 8:
+                    color = WHITE if char.isupper() else BLACK
+                    position.put(y * 8 + x, color, NAMES.index(char.lower()))
+                    x += 1
+                else:
+                    raise ValueError('Bad FEN row ' + row)
+            if x != 8:
+                raise ValueError('Bad FEN row ' + row)
+        if len(fields) > 1 and fields[1] == 'b':
+            position.set_side(BLACK)
+        return position
+
+    def fen(self) -> str:
+        """
+        Returns:
+            (str): the position in Forsyth-Edwards Notation
+        """
+        rows = []
+        for y in range(8):
+            row = ''
+            empty = 0
+            for x in range(8):
+                piece = self.mailbox[y * 8 + x]
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                letter = NAMES[piece % 6]
+                row += letter.upper() if piece < 6 else letter
+            if empty:
+                row += str(empty)
+            rows.append(row)
+        return '/'.join(rows) + (' w' if self.side == WHITE else ' b') + ' - - 0 1'
+
+    def copy(self):
+        """
+        Copies the position, which is only a handful of integers and lists
+        Returns:
+            (Position): the copy
+        """
+        position = Position.__new__(Position)
+        position.pieces = self.pieces[:]
+        position.occupied = self.occupied[:]
+        position.all = self.all
+        position.mailbox = self.mailbox[:]
+        position.side = self.side
+        position.hash = self.hash
+        position.attacks_from = self.attacks_from[:]
+        position.attack_counts = [self.attack_counts[0][:], self.attack_counts[1][:]]
+        position.piece_squares = [set(self.piece_squares[0]), set(self.piece_squares[1])]
+        position.kings = self.kings[:]
+        return position
+
+    def set_side(self, color: int) -> None:
+        """
+        Sets whose move it is
+        Parameters:
+            color (int): WHITE or BLACK
+        """
+        if color != self.side:
+            self.side = color
+            self.hash ^= SIDE_KEY
+
+    def compute_hash(self) -> int:
+        """
+        Works the Zobrist hash out from scratch, for checking the one kept
+        up to date by make and unmake
+        Returns:
+            (int): the hash
+        """
+        key = SIDE_KEY if self.side == BLACK else 0
+        for square, piece in enumerate(self.mailbox):
+            if piece is not None:
+                key ^= ZOBRIST[piece][square]
+        return key
+
+    def compute_attacks(self) -> tuple:
+        """
+        Works the attack maps out from scratch, for checking the ones kept up
+        to date by make and unmake
+        Returns:
+            (tuple): (attacks_from, attack_counts) as they should be
+        """
+        attacks = [0] * 64
+        counts = [[0] * 64, [0] * 64]
+        for square, piece in enumerate(self.mailbox):
+            if piece is not None:
+                attacks[square] = self._attacks_of(piece, square)
+                for target in squares(attacks[square]):
+                    counts[piece // 6][target] += 1
+        return attacks, counts
+
+    def verify(self) -> None:
+        """
+        Checks everything kept up to date as pieces move (bitboards, piece
+        squares, kings, hash and attack maps) against the mailbox
+        Raises:
+            AssertionError: naming the first one that is wrong
+        """
+        pieces = [0] * 12
+        for square, piece in enumerate(self.mailbox):
+            if piece is not None:
+                pieces[piece] |= 1 << square
+        problems = [
+            ('pieces', pieces != self.pieces),
+            ('occupied', self.occupied != [sum(pieces[:6]), sum(pieces[6:])]),
+            ('all', self.all != self.occupied[0] | self.occupied[1]),
+            ('piece_squares', self.piece_squares != [set(squares(self.occupied[0])),
+                                                     set(squares(self.occupied[1]))]),
+            ('kings', self.kings != [pieces[KING].bit_length() - 1 if pieces[KING] else None,
+                                     pieces[6 + KING].bit_length() - 1 if pieces[6 + KING]
+                                     else None]),
+            ('hash', self.hash != self.compute_hash()),
+            ('attack maps', (self.attacks_from, self.attack_counts) != self.compute_attacks()),
+        ]
+        for name, wrong in problems:
+            if wrong:
+                raise AssertionError(name + ' out of step in ' + self.fen())
+
+    def _attacks_of(self, piece: int, square: int) -> int:
+        """
+        Parameters:
+            piece (int): color * 6 + kind of the piece
+            square (int): square it is on
+        Returns:
+            (int): bitboard of the squares it attacks
+        """
+        kind = piece % 6
+        if kind == PAWN:
+            return PAWN_ATTACKS[piece // 6][square]
+        if kind == KNIGHT:
+            return KNIGHT_ATTACKS[square]
+        if kind == KING:
+            return KING_ATTACKS[square]
+        return _slide(square, self.all, SLIDES[kind])
+
+    def _set_attacks(self, square: int, attacks: int, color: int, changes: list = None) -> None:
+        """
+        Changes what the piece on a square attacks, counting the squares it
+        stops and starts attacking
+        Parameters:
+            square (int): square of the piece
+            attacks (int): bitboard of the squares it attacks now
+            color (int): color of the piece
+            changes (list): gets (square, old attacks, color) added if the
+                            attacks change, for unmake to set them back
+        """
+        old = self.attacks_from[square]
+        if old == attacks:
+            return
+        if changes is not None:
+            changes.append((square, old, color))
+        self.attacks_from[square] = attacks
+        counts = self.attack_counts[color]
+        lost = old & ~attacks
+        while lost:
+            low = lost & -lost
+            lost ^= low
+            counts[low.bit_length() - 1] -= 1
+        gained = attacks & ~old
+        while gained:
+            low = gained & -gained
+            gained ^= low
+            counts[low.bit_length() - 1] += 1
+
+    def _repair(self, changed: int, skip: int, changes: list = None) -> None:
+        """
+        Works out again the attacks of the sliding pieces whose rays reach a
+        square that was just emptied or filled.  Nothing else can change
+        Parameters:
+            changed (int): bitboard of the emptied or filled squares
+            skip (int): bitboard of pieces that are already up to date
+            changes (list): passed on to _set_attacks
+        """
+        pieces = self.pieces
+        attacks = self.attacks_from
+        mailbox = self.mailbox
+        occupied = self.all
+        lines = 0
+        bits = changed
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            lines |= LINES[low.bit_length() - 1]
+        sliders = (pieces[2] | pieces[3] | pieces[4] | pieces[8] | pieces[9] |
+                   pieces[10]) & lines & ~skip
+        while sliders:
+            low = sliders & -sliders
+            sliders ^= low
+            square = low.bit_length() - 1
+            if attacks[square] & changed:
+                piece = mailbox[square]
+                self._set_attacks(square, _slide(square, occupied, SLIDES[piece % 6]),
+                                  piece // 6, changes)
+
+    def attacked(self, color: int) -> int:
+        """
+        Parameters:
+            color (int): color of the attackers
+        Returns:
+            (int): bitboard of every square that color attacks
+        """
+        found = 0
+        attacks = self.attacks_from
+        for square in squares(self.occupied[color]):
+            found |= attacks[square]
+        return found
+
+    def piece_at(self, square: int):
+        """
+        Parameters:
+            square (int): square to look at
+        Returns:
+            (tuple): (color, kind) of the piece there, None if it is empty
+        """
+        piece = self.mailbox[square]
+        if piece is None:
+            return None
+        return divmod(piece, 6)
+
+    def put(self, square: int, color: int, kind: int) -> None:
+        """
+        Puts a piece on an empty square
+        Parameters:
+            square (int): square to put it on
+            color (int): WHITE or BLACK
+            kind (int): PAWN through KING
+        """
+        bit = 1 << square
+        self.pieces[color * 6 + kind] |= bit
+        self.occupied[color] |= bit
+        self.all |= bit
+        self.mailbox[square] = color * 6 + kind
+        self.hash ^= ZOBRIST[color * 6 + kind][square]
+        self.piece_squares[color].add(square)
+        if kind == KING:
+            self.kings[color] = square
+        self._set_attacks(square, self._attacks_of(color * 6 + kind, square), color)
+        self._repair(bit, bit)
+
+    def remove(self, square: int) -> None:
+        """
+        Takes the piece off a square
+        Parameters:
+            square (int): square to clear, which has to hold a piece
+        """
+        piece = self.mailbox[square]
+        bit = 1 << square
+        self.pieces[piece] ^= bit
+        self.occupied[piece // 6] ^= bit
+        self.all ^= bit
+        self.mailbox[square] = None
+        self.hash ^= ZOBRIST[piece][square]
+        self.piece_squares[piece // 6].discard(square)
+        if piece % 6 == KING:
+            self.kings[piece // 6] = None
+        self._set_attacks(square, 0, piece // 6)
+        self._repair(bit, 0)
+
+    def attackers(self, square: int, color: int, occupied: int = None) -> int:
+        """
+        Finds the pieces of one color that attack a square
+        Parameters:
+            square (int): square being attacked
+            color (int): color of the attackers
+            occupied (int): pieces that block sliding attacks, every piece
+                            if None
+        Returns:
+            (int): bitboard of the attacking pieces
+        """
+        pieces = self.pieces
+        base = color * 6
+        diagonal = pieces[base + BISHOP] | pieces[base + QUEEN]
+        straight = pieces[base + ROOK] | pieces[base + QUEEN]
+        # A pawn attacks this square from where an enemy pawn here would
+        # attack
+        found = (KNIGHT_ATTACKS[square] & pieces[base + KNIGHT] |
+                 KING_ATTACKS[square] & pieces[base + KING] |
+                 PAWN_ATTACKS[1 - color][square] & pieces[base + PAWN])
+        if occupied is None:
+            occupied = self.all
+        if diagonal:
+            found |= bishop_attacks(square, occupied) & diagonal
+        if straight:
+            found |= rook_attacks(square, occupied) & straight
+        return found
+
+    def is_attacked(self, square: int, color: int) -> bool:
+        """
+        Parameters:
+            square (int): square being attacked
+            color (int): color of the attackers
+        Returns:
+            (bool): True if any piece of that color attacks the square
+        """
+        return self.attack_counts[color][square] > 0
+
+    def king_square(self, color: int):
+        """
+        Parameters:
+            color (int): color of the king
+        Returns:
+            (int): square of the king, None if it is not on the board
+        """
+        return self.kings[color]
+
+    def in_check(self, color: int) -> bool:
+        """
+        Parameters:
+            color (int): color of the king
+        Returns:
+            (bool): True if that color's king is attacked
+        """
+        king = self.pieces[color * 6 + KING]
+        return king != 0 and self.attack_counts[1 - color][king.bit_length() - 1] > 0
+
+    def targets(self, square: int) -> int:
+        """
+        Gets the squares the piece on a square can move to, without looking
+        at whether the move leaves its own king in check
+        Parameters:
+            square (int): square of the piece
+        Returns:
+            (int): bitboard of the squares it can move to
+        """
+        color, kind = divmod(self.mailbox[square], 6)
+        if kind == PAWN:
+            targets = PAWN_ATTACKS[color][square] & self.occupied[1 - color]
+            step = 8 if color == BLACK else -8
+            ahead = square + step
+            if not self.all >> ahead & 1:
+                targets |= 1 << ahead
+                if square >> 3 == PAWN_START[color] and not self.all >> (ahead + step) & 1:
+                    targets |= 1 << (ahead + step)
+            return targets
+        # Every other piece moves to the squares it attacks
+        return self.attacks_from[square] & ~self.occupied[color]
+
+    def pseudo_moves(self, color: int) -> list[tuple[int, int]]:
+        """
+        Gets every move the pieces of one color can make, without looking
+        at whether the move leaves its own king in check
+        Parameters:
+            color (int): color to move
+        Returns:
+            (list): (from square, to square) tuples
+        """
+        moves = []
+        for start in squares(self.occupied[color]):
+            for end in squares(self.targets(start)):
+                moves.append((start, end))
+        return moves
+
+    def make(self, start: int, end: int) -> tuple:
+        """
+        Moves a piece, taking whatever is on the end square and promoting
+        pawns that reach the last row to queens.  Passes the move to the
+        other side
+        Parameters:
+            start (int): square the piece is on
+            end (int): square it moves to
+        Returns:
+            (tuple): undo record (start, end, moved piece, captured piece or
+                     None, hash before the move, (square, old attacks,
+                     color) for each square whose attacks changed) to hand
+                     to unmake
+        """
+        mailbox = self.mailbox
+        pieces = self.pieces
+        occupied = self.occupied
+        piece = mailbox[start]
+        captured = mailbox[end]
+        color = piece // 6
+        start_bit = 1 << start
+        end_bit = 1 << end
+        before = self.hash
+        key = before ^ SIDE_KEY ^ ZOBRIST[piece][start]
+        if captured is not None:
+            pieces[captured] ^= end_bit
+            occupied[1 - color] ^= end_bit
+            key ^= ZOBRIST[captured][end]
+        else:
+            self.all ^= end_bit
+        placed = piece
+        if piece % 6 == PAWN and end >> 3 == PROMOTION_ROW[color]:
+            placed = color * 6 + QUEEN
+        pieces[piece] ^= start_bit
+        pieces[placed] ^= end_bit
+        occupied[color] ^= start_bit | end_bit
+        self.all ^= start_bit
+        mailbox[start] = None
+        mailbox[end] = placed
+        self.side ^= 1
+        self.hash = key ^ ZOBRIST[placed][end]
+        own = self.piece_squares[color]
+        own.remove(start)
+        own.add(end)
+        if captured is not None:
+            self.piece_squares[1 - color].remove(end)
+            if captured % 6 == KING:
+                self.kings[1 - color] = None
+        if piece % 6 == KING:
+            self.kings[color] = end
+        # Only the moved and captured pieces and sliders whose rays cross the
+        # start or end square attack anything new.  The old attacks of each
+        # square that changes are kept so unmake can put them back
+        changes = []
+        self._set_attacks(start, 0, color, changes)
+        if captured is not None:
+            self._set_attacks(end, 0, 1 - color, changes)
+        self._set_attacks(end, self._attacks_of(placed, end), color, changes)
+        self._repair(start_bit | end_bit, end_bit, changes)
+        if self.debug:
+            self.verify()
+        return start, end, piece, captured, before, changes
+
+    def unmake(self, record: tuple) -> None:
+        """
+        Takes back a move made with make
+        Parameters:
+            record (tuple): undo record make returned
+        """
+        start, end, piece, captured, before, changes = record
+        mailbox = self.mailbox
+        pieces = self.pieces
+        occupied = self.occupied
+        color = piece // 6
+        start_bit = 1 << start
+        end_bit = 1 << end
+        pieces[mailbox[end]] ^= end_bit
+        pieces[piece] ^= start_bit
+        occupied[color] ^= start_bit | end_bit
+        self.all ^= start_bit
+        if captured is not None:
+            pieces[captured] ^= end_bit
+            occupied[1 - color] ^= end_bit
+        else:
+            self.all ^= end_bit
+        mailbox[start] = piece
+        mailbox[end] = captured
+        self.side ^= 1
+        self.hash = before
+        # Put each square's attacks back, newest first, taking back the
+        # counts they changed
+        attacks_from = self.attacks_from
+        attack_counts = self.attack_counts
+        for square, old, attack_color in reversed(changes):
+            now = attacks_from[square]
+            attacks_from[square] = old
+            counts = attack_counts[attack_color]
+            gained = now & ~old
+            while gained:
+                low = gained & -gained
+                gained ^= low
+                counts[low.bit_length() - 1] -= 1
+            lost = old & ~now
+            while lost:
+                low = lost & -lost
+                lost ^= low
+                counts[low.bit_length() - 1] += 1
+        own = self.piece_squares[color]
+        own.remove(end)
+        own.add(start)
+        if captured is not None:
+            self.piece_squares[1 - color].add(end)
+            if captured % 6 == KING:
+                self.kings[1 - color] = end
+        if piece % 6 == KING:
+            self.kings[color] = start
+        if self.debug:
+            self.verify()
+
+    def legal_moves(self, color: int) -> list[tuple[int, int]]:
+        """
+        Gets the moves of one color that don't leave its own king in check.
+        The pieces checking the king and the pinned pieces are found once,
+        so no move has to be tried to see if it is legal
+        Parameters:
+            color (int): color to move
+        Returns:
+            (list): (from square, to square) tuples
+        """
+        king = self.king_square(color)
+        if king is None:
+            return self.pseudo_moves(color)
+        enemy = 1 - color
+        own = self.occupied[color]
+        checkers = self.attackers(king, enemy)
+        # The king is tested with itself taken off the board, so it can't
+        # step back along the ray of a piece checking it
+        counts = self.attack_counts[enemy]
+        without_king = self.all ^ 1 << king
+        king_moves = [(king, end) for end in squares(KING_ATTACKS[king] & ~own)
+                      if counts[end] == 0 and
+                      not (checkers and self.attackers(end, enemy, without_king))]
+        if checkers & (checkers - 1):
+            # Only the king can get out of a double check
+            return king_moves
+        allowed = FULL
+        if checkers:
+            # Take the checking piece or block it
+            allowed = checkers | BETWEEN[king][checkers.bit_length() - 1]
+        pins = self.pins(color)
+        moves = []
+        for start in squares(own):
+            if start == king:
+                moves += king_moves
+                continue
+            targets = self.targets(start) & allowed
+            if start in pins:
+                targets &= pins[start]
+            for end in squares(targets):
+                moves.append((start, end))
+        return moves
+
+    def pins(self, color: int) -> dict:
+        """
+        Finds the pieces of one color that can't leave the line between
+        their king and an enemy sliding piece
+        Parameters:
+            color (int): color of the pinned pieces
+        Returns:
+            (dict): square of each pinned piece to a bitboard of the squares
+                    it can still move to, the line up to and including the
+                    piece pinning it
+        """
+        pins = {}
+        king = self.king_square(color)
+        base = (1 - color) * 6
+        pieces = self.pieces
+        diagonal = pieces[base + BISHOP] | pieces[base + QUEEN]
+        straight = pieces[base + ROOK] | pieces[base + QUEEN]
+        if king is None or not (diagonal | straight) & LINES[king]:
+            return pins
+        own = self.occupied[color]
+        for direction in range(8):
+            sliders = straight if direction in ORTHOGONAL else diagonal
+            ray = RAYS[direction][king]
+            if not sliders & ray:
+                continue
+            blockers = ray & self.all
+            # The nearest piece has to be our own and the one behind it an
+            # enemy piece that slides this way
+            if direction < 4:
+                first = (blockers & -blockers).bit_length() - 1
+                rest = blockers ^ 1 << first
+                second = (rest & -rest).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+                rest = blockers ^ 1 << first
+                second = rest.bit_length() - 1
+            if own >> first & 1 and rest and sliders >> second & 1:
+                pins[first] = BETWEEN[king][second] | 1 << second
+        return pins
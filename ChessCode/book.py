@@ -0,0 +1,190 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Opening book: moves to play from known opening positions without
+# searching.  The book is a binary file of 12 byte records, big-endian
+# (position hash: 8 bytes, move: 2 bytes as from square << 6 | to square,
+# weight: 2 bytes), sorted by hash.  It is mapped into memory and looked up
+# by binary search, and a move is picked at random in proportion to its
+# weight.  The file is built from a text file of opening lines.
+#
+#     python book.py openings.txt book.bin     build the book
+#     python book.py --show "FEN"              list the book moves for a position
+import argparse
+import mmap
+import os
+import random
+import struct
+from collections import Counter
+
+import bitboard
+from bitboard import Position
+
+RECORD = struct.Struct('>QHH')
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'book.bin')
+LINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openings.txt')
+
+
+def read_lines(path: str) -> Counter:
+    """
+    Plays through every line of an openings file, counting how often each
+    move is played from each position
+    Parameters:
+        path (str): text file with one line of moves like e2e4 e7e5 per
+                    row, blank rows and rows starting with # are skipped
+    Returns:
+        (Counter): (position hash, move) to the number of lines playing it
+    Raises:
+        ValueError: naming the row and move if a move can't be read or
+                    isn't legal
+    """
+    counts = Counter()
+    with open(path) as file:
+        for row, text in enumerate(file, 1):
+            text = text.strip()
+            if not text or text.startswith('#'):
+                continue
+            position = Position.start()
+            for name in text.split():
+                move = bitboard.parse_move(name)
+                if move not in position.legal_moves(position.side):
+                    raise ValueError(f'{path} row {row}: {name} is not legal')
+                counts[(position.hash, move)] += 1
+                position.make(*move)
+    return counts
+
+
+def write_book(counts: Counter, path: str) -> int:
+    """
+    Writes the book file, sorted by position hash
+    Parameters:
+        counts (Counter): (position hash, move) to weight, from read_lines
+        path (str): file to write
+    Returns:
+        (int): number of records written
+    """
+    with open(path, 'wb') as file:
+        for (key, (start, end)), weight in sorted(counts.items()):
+            file.write(RECORD.pack(key, start << 6 | end, min(weight, 0xFFFF)))
+    return len(counts)
+
+
+class OpeningBook:
+    """
+    Read-only opening book file mapped into memory
+    Attributes:
+        path (str): the book file
+        size (int): number of records
+    """
+    def __init__(self, path: str = BOOK_PATH) -> None:
+        """
+        Opens a book file
+        Parameters:
+            path (str): file written by write_book
+        """
+        self.path = path
+        self.size = os.path.getsize(path) // RECORD.size
+        self._data = None
+        if self.size:
+            with open(path, 'rb') as file:
+                self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def default(cls):
+        """
+        Returns:
+            (OpeningBook): the book shipped next to this module, None if
+                           it is missing
+        """
+        if not os.path.exists(BOOK_PATH):
+            return None
+        return cls(BOOK_PATH)
+
+    def close(self) -> None:
+        """
+        Unmaps the file
+        """
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    def _key(self, index: int) -> int:
+        """
+        Parameters:
+            index (int): record number
+        Returns:
+            (int): position hash of that record
+        """
+        return RECORD.unpack_from(self._data, index * RECORD.size)[0]
+
+    def entries(self, key: int) -> list[tuple[tuple[int, int], int]]:
+        """
+        Looks a position up
+        Parameters:
+            key (int): Zobrist hash of the position, including side to move
+        Returns:
+            (list): ((from square, to square), weight) for each book move
+        """
+        if self._data is None:
+            return []
+        # Binary search for the first record with this hash
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.size:
+            record_key, move, weight = RECORD.unpack_from(self._data, low * RECORD.size)
+            if record_key != key:
+                break
+            found.append(((move >> 6, move & 63), weight))
+            low += 1
+        return found
+
+    def choose(self, position: Position, rng: random.Random = None):
+        """
+        Picks a book move for the side to move, more often the more weight
+        it has.  Moves that aren't legal, which only happens if two
+        positions share a hash, are skipped
+        Parameters:
+            position (Position): position to look up
+            rng (Random): random numbers to use, the random module if None
+        Returns:
+            (tuple): (from square, to square), None if the position isn't
+                     in the book
+        """
+        legal = position.legal_moves(position.side)
+        entries = [(move, weight) for move, weight in self.entries(position.hash)
+                   if move in legal and weight > 0]
+        if not entries:
+            return None
+        rng = rng if rng is not None else random
+        return rng.choices([move for move, _ in entries],
+                           weights=[weight for _, weight in entries])[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or look in the opening book.')
+    parser.add_argument('lines', nargs='?', default=LINES_PATH, help='openings text file to build from')
+    parser.add_argument('book', nargs='?', default=BOOK_PATH, help='book file to write or read')
+    parser.add_argument('--show', metavar='FEN', help='list the book moves for a position instead')
+    args = parser.parse_args()
+
+    if args.show:
+        book = OpeningBook(args.book)
+        for move, weight in book.entries(Position.from_fen(args.show).hash):
+            print(bitboard.move_name(move) + ': ' + str(weight))
+        return
+    counts = read_lines(args.lines)
+    records = write_book(counts, args.book)
+    print(f'{records} moves from {len({key for key, _ in counts})} positions written to '
+          f'{args.book} ({records * RECORD.size} bytes)')
+
+
+if __name__ == '__main__':
+    main()
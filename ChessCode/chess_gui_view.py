@@ -1,6 +1,8 @@
 import pygame as pg
 import pygame_gui as gui
 from game import *
+from sprites import piece_image
+from ai_worker import AIWorker
 
 
 class GUI:
@@ -9,7 +11,6 @@ class GUI:
         self._game = Game()
         self._screen = pg.display.set_mode((1440, 900))
         pg.display.set_caption("Laker Chess")
-        self._pieces = pg.image.load("./images/pieces.png")
         self._ui_manager = gui.UIManager((1440, 900))
         self._side_box = gui.elements.UITextBox('<b>Laker Chess</b><br /><br />White moves first.<br />', relative_rect=pg.Rect((1000, 100), (400, 500)),
                                  manager=self._ui_manager)
@@ -17,6 +18,13 @@ class GUI:
                                      manager=self._ui_manager)
         self._restart_button = gui.elements.UIButton(relative_rect = pg.Rect((1200, 50), (100, 50)), text='Reset',
                                      manager=self._ui_manager)
+        # Only shown while the computer is thinking
+        self._cancel_button = gui.elements.UIButton(relative_rect = pg.Rect((1000, 620), (100, 50)), text='Cancel',
+                                     manager=self._ui_manager)
+        self._cancel_button.hide()
+        self._worker = AIWorker(self._game.engine, book=self._game.book)
+        # True from the player's move until the computer's answer is played
+        self._waiting = False
         self._piece_selected = False
         self._first_selected = (0, 0)
         self._second_selected = (0, 0)
@@ -30,7 +38,8 @@ class GUI:
             for event in pg.event.get():
                 if event.type == pg.QUIT:
                     running = False
-                if event.type == pg.MOUSEBUTTONDOWN:
+                # The board takes no clicks while the computer is thinking
+                if event.type == pg.MOUSEBUTTONDOWN and not self._waiting:
                     x, y = pg.mouse.get_pos()
                     y, x = self.__get_coords__(y, x)
                     piece = self._game.get(y, x)
@@ -39,7 +48,9 @@ class GUI:
                             continue
                         self._piece_selected = True
                         self._first_selected = y, x
-                        self._valid_moves = piece.valid_moves(y, x)
+                        self._valid_moves = [(y2, x2) for y1, x1, y2, x2
+                                             in self._game.legal_moves(piece.color)
+                                             if (y1, x1) == (y, x)]
                         self._piece_selected = piece
                     elif self._piece_selected and (y, x) in self._valid_moves:
                         target = self._game.get(y, x)
@@ -50,35 +61,49 @@ class GUI:
                             if target:
                                 self._side_box.append_html_text(' and captures ' + str(type(target).__name__))
                             self._side_box.append_html_text('<br />')
-                            computer_message = self._game._computer_move()
-                            if computer_message:
-                                self._side_box.append_html_text(computer_message)
+                            # The computer thinks in the background (or keeps
+                            # on if it was pondering this move) and its move
+                            # is played when the loop below finds it ready
+                            self._worker.reply(self._game._computer_position())
+                            self._waiting = True
+                            self._side_box.append_html_text('BLACK is thinking...<br />')
+                            self._cancel_button.show()
                         else:
                             self._side_box.append_html_text('Invalid move.  Would leave '
                                                             + str(self._piece_selected.color.name) + ' in check.<br />')
-                        if self._game.check(Color.WHITE):
-                            self._side_box.append_html_text("WHITE is in CHECK!<br />")
-                        if self._game.check(Color.BLACK):
-                            self._side_box.append_html_text("BLACK is in CHECK!<br />")
-                        if self._game.mate(Color.WHITE):
-                            self._side_box.append_html_text("WHITE is in CHECKMATE!<br />GAME OVER!")
-                        if self._game.mate(Color.BLACK):
-                            self._side_box.append_html_text("BLACK is in CHECKMATE!<br />GAME OVER!")
+                            self.__report_checks__()
 
                         self._piece_selected = False
                     else:
                         self._piece_selected = False
                 if event.type == gui.UI_BUTTON_PRESSED:
                     if event.ui_element == self._restart_button:
+                        self._stop_thinking()
                         self._game.reset()
                         self._side_box.set_text("Restarting game...<br />")
-                    if event.ui_element == self._undo_button:
+                    if event.ui_element == self._cancel_button or \
+                            event.ui_element == self._undo_button and self._waiting:
+                        # Stop the search and take back the move it was answering
+                        self._stop_thinking()
+                        self._game._take_back()
+                        self._side_box.append_html_text('BLACK stopped thinking.  WHITE to move again.<br />')
+                    elif event.ui_element == self._undo_button:
+                        self._stop_thinking()
                         if self._game.undo():
                             self._side_box.append_html_text('Undoing move.<br />')
                         else:
                             self._side_box.append_html_text('Nothing to undo.<br />')
             self._ui_manager.process_events(event)
 
+            # Play the computer's move once the worker has found it
+            if self._worker.done():
+                self._cancel_button.hide()
+                self._waiting = False
+                self._game._play_computer_move(self._worker.move)
+                self.__report_checks__()
+                # Think about the player's likely reply while they choose
+                self._worker.start_pondering(self._game._computer_position(Color.WHITE))
+
             self._screen.fill((255, 255, 255))
             self.__draw_board__()
             self._ui_manager.draw_ui(self._screen)
@@ -87,6 +112,27 @@ class GUI:
             pg.display.flip()
             time_delta = clock.tick(30) / 1000.0
 
+    def _stop_thinking(self) -> None:
+        """
+        Cancels the computer's search if it is running
+        """
+        self._worker.cancel()
+        self._cancel_button.hide()
+        self._waiting = False
+
+    def __report_checks__(self) -> None:
+        """
+        Writes to the side box if either king is in check or checkmate
+        """
+        if self._game.check(Color.WHITE):
+            self._side_box.append_html_text("WHITE is in CHECK!<br />")
+        if self._game.check(Color.BLACK):
+            self._side_box.append_html_text("BLACK is in CHECK!<br />")
+        if self._game.mate(Color.WHITE):
+            self._side_box.append_html_text("WHITE is in CHECKMATE!<br />GAME OVER!")
+        if self._game.mate(Color.BLACK):
+            self._side_box.append_html_text("BLACK is in CHECKMATE!<br />GAME OVER!")
+
     def __get_coords__(self, y, x):
         grid_x = x // 105
         grid_y = y // 105
@@ -108,7 +154,7 @@ class GUI:
                 if self._valid_moves and self._piece_selected and (y, x) in self._valid_moves:
                     pg.draw.rect(self._screen, (0, 0, 255), pg.rect.Rect(x * 105, y * 105, 105, 105), 2)
                 if self._game.get(y, x):
-                    self._screen.blit(self._game.get(y, x)._image, (x * 105, y * 105))
+                    self._screen.blit(piece_image(self._game.get(y, x)), (x * 105, y * 105))
             count = count + 1
         pg.draw.line(self._screen, (0, 0, 0), (0, 840), (840, 840))
         pg.draw.line(self._screen, (0, 0, 0), (840, 840), (840, 0))
@@ -0,0 +1,507 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Search engine for the computer player.  It runs a negamax search with
+# alpha-beta pruning over bitboard Positions, deepening one ply at a time
+# until it reaches its depth or runs out of time, and scores positions by
+# material plus piece-square tables.  Captures are searched past the last
+# ply (quiescence search) so it doesn't stop in the middle of a trade, and
+# results are kept in a transposition table (tt.py) between searches.
+# Positions with a king and one piece against a king are looked up in the
+# endgame tablebases (tablebase.py) instead of searched, if they are built.
+# Moves are tried best-looking first (ordering.py), which is where most of
+# alpha-beta's pruning comes from.
+#
+#     python engine.py --fen "..." --depth 5
+#     python engine.py --depth 5 --compare     cutoffs with and without ordering
+import argparse
+import threading
+import time
+
+import bitboard
+from bitboard import Position, WHITE, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from tt import TranspositionTable, EXACT, LOWER, UPPER
+from tablebase import Tablebases
+from ordering import MoveOrderer
+
+# Scores are in centipawns from the point of view of the side to move
+MATE = 100000
+# Scores past this are mates
+MATE_BOUND = MATE - 1000
+# Depth stored for positions with no legal moves, whose score never changes
+# however deep they are searched
+TERMINAL_DEPTH = 255
+PIECE_VALUES = [100, 320, 330, 500, 900, 0]
+
+# Piece-square tables from white's side of the board.  Index y * 8 + x, so
+# the first row is the far (black) side like Game._board
+PIECE_SQUARE = {
+    PAWN: [0, 0, 0, 0, 0, 0, 0, 0,
+           50, 50, 50, 50, 50, 50, 50, 50,
+           10, 10, 20, 30, 30, 20, 10, 10,
+           5, 5, 10, 25, 25, 10, 5, 5,
+           0, 0, 0, 20, 20, 0, 0, 0,
+           5, -5, -10, 0, 0, -10, -5, 5,
+           5, 10, 10, -20, -20, 10, 10, 5,
+           0, 0, 0, 0, 0, 0, 0, 0],
+    KNIGHT: [-50, -40, -30, -30, -30, -30, -40, -50,
+             -40, -20, 0, 0, 0, 0, -20, -40,
+             -30, 0, 10, 15, 15, 10, 0, -30,
+             -30, 5, 15, 20, 20, 15, 5, -30,
+             -30, 0, 15, 20, 20, 15, 0, -30,
+             -30, 5, 10, 15, 15, 10, 5, -30,
+             -40, -20, 0, 5, 5, 0, -20, -40,
+             -50, -40, -30, -30, -30, -30, -40, -50],
+    BISHOP: [-20, -10, -10, -10, -10, -10, -10, -20,
+             -10, 0, 0, 0, 0, 0, 0, -10,
+             -10, 0, 5, 10, 10, 5, 0, -10,
+             -10, 5, 5, 10, 10, 5, 5, -10,
+             -10, 0, 10, 10, 10, 10, 0, -10,
+             -10, 10, 10, 10, 10, 10, 10, -10,
+             -10, 5, 0, 0, 0, 0, 5, -10,
+             -20, -10, -10, -10, -10, -10, -10, -20],
+    ROOK: [0, 0, 0, 0, 0, 0, 0, 0,
+           5, 10, 10, 10, 10, 10, 10, 5,
+           -5, 0, 0, 0, 0, 0, 0, -5,
+           -5, 0, 0, 0, 0, 0, 0, -5,
+           -5, 0, 0, 0, 0, 0, 0, -5,
+           -5, 0, 0, 0, 0, 0, 0, -5,
+           -5, 0, 0, 0, 0, 0, 0, -5,
+           0, 0, 0, 5, 5, 0, 0, 0],
+    QUEEN: [-20, -10, -10, -5, -5, -10, -10, -20,
+            -10, 0, 0, 0, 0, 0, 0, -10,
+            -10, 0, 5, 5, 5, 5, 0, -10,
+            -5, 0, 5, 5, 5, 5, 0, -5,
+            0, 0, 5, 5, 5, 5, 0, -5,
+            -10, 5, 5, 5, 5, 5, 0, -10,
+            -10, 0, 5, 0, 0, 0, 0, -10,
+            -20, -10, -10, -5, -5, -10, -10, -20],
+    KING: [-30, -40, -40, -50, -50, -40, -40, -30,
+           -30, -40, -40, -50, -50, -40, -40, -30,
+           -30, -40, -40, -50, -50, -40, -40, -30,
+           -30, -40, -40, -50, -50, -40, -40, -30,
+           -20, -30, -30, -40, -40, -30, -30, -20,
+           -10, -20, -20, -20, -20, -20, -20, -10,
+           20, 20, 0, 0, 0, 0, 20, 20,
+           20, 30, 10, 0, 0, 10, 30, 20],
+}
+
+# Score of every piece (color * 6 + kind) on every square, from white's
+# point of view.  Black uses the white tables flipped top to bottom
+SQUARE_SCORES = []
+for _color in range(2):
+    for _kind in range(6):
+        _table = PIECE_SQUARE[_kind]
+        if _color == WHITE:
+            SQUARE_SCORES.append([PIECE_VALUES[_kind] + _table[square]
+                                  for square in range(64)])
+        else:
+            SQUARE_SCORES.append([-PIECE_VALUES[_kind] - _table[square ^ 56]
+                                  for square in range(64)])
+
+
+def to_table(score: int, ply: int) -> int:
+    """
+    Mate scores count plies from the top of the search, so they are stored
+    counting from the position itself instead
+    Parameters:
+        score (int): score from the search
+        ply (int): plies from the top of the search to the position
+    Returns:
+        (int): score to store
+    """
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def from_table(score: int, ply: int) -> int:
+    """
+    Turns a stored score back into one for the search, see to_table
+    Parameters:
+        score (int): stored score
+        ply (int): plies from the top of the search to the position
+    Returns:
+        (int): score for the search
+    """
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def evaluate(position) -> int:
+    """
+    Scores a position by material and where the pieces stand
+    Parameters:
+        position (Position): position to score
+    Returns:
+        (int): score in centipawns for the side to move
+    """
+    score = 0
+    for piece, bits in enumerate(position.pieces):
+        table = SQUARE_SCORES[piece]
+        while bits:
+            low = bits & -bits
+            score += table[low.bit_length() - 1]
+            bits ^= low
+    return score if position.side == WHITE else -score
+
+
+class _OutOfTime(Exception):
+    """
+    Raised inside the search when the time limit runs out or it is told to
+    stop
+    """
+
+
+class Engine:
+    """
+    Alpha-beta search that picks a move for the side to move
+    Attributes:
+        depth (int): deepest iteration to search
+        time_limit (float): seconds a search may take, None for no limit
+        table (TranspositionTable): results kept between searches
+        nodes (int): positions visited by the last search
+        score (int): score of the last move found, for the side that moved
+        completed_depth (int): deepest iteration the last search finished
+        tablebases (Tablebases): endgame tables probed during the search
+        tablebase_hits (int): positions the last search looked up in them
+        orderer (MoveOrderer): sorts the moves searched, None to search
+                               them in the order they are generated
+        cutoffs (int): beta cutoffs in the last search
+        first_cutoffs (int): of those, how many came from the first move
+    """
+    def __init__(self, depth: int = 4, time_limit: float = 1.0,
+                 table: TranspositionTable = None,
+                 tablebases: Tablebases = None, ordering: bool = True) -> None:
+        """
+        Creates an engine
+        Parameters:
+            depth (int): deepest iteration to search
+            time_limit (float): seconds a search may take, None for no limit
+            table (TranspositionTable): table to use, a new one if None
+            tablebases (Tablebases): endgame tables, the ones built in
+                                     tablebases/ (if any) if None
+            ordering (bool): False to leave out move ordering, apart from
+                             trying the table's move first
+        """
+        self.depth = depth
+        self.time_limit = time_limit
+        self.table = table if table is not None else TranspositionTable()
+        self.tablebases = tablebases if tablebases is not None else Tablebases()
+        self.tablebase_hits = 0
+        self.orderer = MoveOrderer() if ordering else None
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self.nodes = 0
+        self.score = 0
+        self.completed_depth = 0
+        self._started = 0.0
+        self._deadline = None
+        self._stop = None
+
+    def search(self, position, stop: threading.Event = None, ponder: bool = False):
+        """
+        Finds the best move for the side to move, searching one ply deeper
+        each time until the depth or the time limit is reached.  The move
+        from the deepest finished iteration is used
+        Parameters:
+            position (Position): position to search, which is not changed
+            stop (Event): set from another thread to end the search early,
+                          the same way running out of time does
+            ponder (bool): True to search with no time limit until
+                           ponder_hit is called, for thinking on the
+                           player's time
+        Returns:
+            (tuple): (from square, to square), None if there is no legal move
+        """
+        # Searching a copy means running out of time in the middle of a
+        # move can't leave the caller's position half changed
+        position = position.copy()
+        self.nodes = 0
+        self.tablebase_hits = 0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self.completed_depth = 0
+        self._started = time.perf_counter()
+        self._deadline = None
+        self._stop = stop
+        if self.time_limit is not None and not ponder:
+            self._deadline = self._started + self.time_limit
+        self.table.new_search()
+        moves = position.legal_moves(position.side)
+        if not moves:
+            return None
+        entry = self.table.probe(position.hash)
+        table_move = entry[4] if entry is not None else None
+        if self.orderer is not None:
+            self.orderer.new_search()
+            moves = self.orderer.order(position, moves, table_move, 0)
+        elif table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+        best = moves[0]
+        for depth in range(1, self.depth + 1):
+            try:
+                score, move = self._root(position, depth, moves)
+            except _OutOfTime:
+                break
+            best = move
+            self.score = score
+            self.completed_depth = depth
+            # Try the best move first next time, which prunes much more
+            moves.remove(move)
+            moves.insert(0, move)
+            # Nothing deeper will beat a forced mate
+            if abs(score) > MATE_BOUND:
+                break
+        return best
+
+    def ponder_hit(self) -> None:
+        """
+        Starts the time limit on a search begun with ponder=True, once the
+        position it is searching has come up in the game.  The time spent
+        pondering counts, so the search ends when it has had as long as an
+        ordinary one.  Called from a different thread than the search
+        """
+        if self.time_limit is not None:
+            self._deadline = self._started + self.time_limit
+
+    def principal_variation(self, position, length: int = 8) -> list:
+        """
+        Follows the best moves stored in the table from a position, which
+        after a search is the line the engine expects to be played
+        Parameters:
+            position (Position): position to start from, which is not changed
+            length (int): most moves to follow
+        Returns:
+            (list): (from square, to square) moves
+        """
+        position = position.copy()
+        line = []
+        seen = set()
+        while len(line) < length and position.hash not in seen:
+            seen.add(position.hash)
+            entry = self.table.probe(position.hash)
+            if entry is None or entry[4] not in position.legal_moves(position.side):
+                break
+            line.append(entry[4])
+            position.make(*entry[4])
+        return line
+
+    def _root(self, position, depth: int, moves: list) -> tuple:
+        """
+        Searches every legal move at the top of the tree
+        Parameters:
+            position (Position): position to search
+            depth (int): plies to search
+            moves (list): legal moves of the side to move
+        Returns:
+            (tuple): (score, best move)
+        """
+        alpha = -MATE - 1
+        best = moves[0]
+        for start, end in moves:
+            record = position.make(start, end)
+            score = -self._negamax(position, depth - 1, -MATE - 1, -alpha, 1)
+            position.unmake(record)
+            if score > alpha:
+                alpha = score
+                best = (start, end)
+        self.table.store(position.hash, depth, alpha, EXACT, best)
+        return alpha, best
+
+    def _tick(self) -> None:
+        """
+        Counts a node and stops the search if it is out of time or has been
+        told to stop
+        """
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            if self._deadline is not None and time.perf_counter() > self._deadline:
+                raise _OutOfTime()
+            if self._stop is not None and self._stop.is_set():
+                raise _OutOfTime()
+
+    def _negamax(self, position, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """
+        Scores a position by searching the moves below it
+        Parameters:
+            position (Position): position to score
+            depth (int): plies left to search
+            alpha (int): score the side to move is already sure of
+            beta (int): score the other side is already sure of
+            ply (int): plies from the top of the tree
+        Returns:
+            (int): score for the side to move
+        """
+        # Three pieces left is an exact answer from the tablebases, scored
+        # like a mate found by searching
+        if self.tablebases and len(position.piece_squares[0]) + \
+                len(position.piece_squares[1]) == 3:
+            found = self.tablebases.probe(position)
+            if found is not None:
+                self.tablebase_hits += 1
+                result, plies = found
+                if result > 0:
+                    return MATE - ply - plies
+                if result < 0:
+                    return -MATE + ply + plies
+                return 0
+        if depth <= 0:
+            return self._quiesce(position, alpha, beta)
+        self._tick()
+        key = position.hash
+        entry = self.table.probe(key)
+        table_move = None
+        if entry is not None:
+            table_move = entry[4]
+            if entry[1] >= depth:
+                score = from_table(entry[2], ply)
+                bound = entry[3]
+                if bound == EXACT or bound == LOWER and score >= beta or \
+                        bound == UPPER and score <= alpha:
+                    return score
+        color = position.side
+        moves = position.legal_moves(color)
+        # The best move from before is the one most likely to cut off
+        if self.orderer is not None:
+            moves = self.orderer.order(position, moves, table_move, ply)
+        elif table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+        start_alpha = alpha
+        best_score = -MATE - 1
+        best_move = None
+        for number, move in enumerate(moves):
+            record = position.make(*move)
+            score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            position.unmake(record)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if score >= beta:
+                        self.cutoffs += 1
+                        if number == 0:
+                            self.first_cutoffs += 1
+                        if self.orderer is not None:
+                            self.orderer.cutoff(position, move, depth, ply)
+                        break
+        if best_move is None:
+            # Mated sooner is worse, stalemate is a draw
+            best_score = -MATE + ply if position.in_check(color) else 0
+            self.table.store(key, TERMINAL_DEPTH, to_table(best_score, ply), EXACT, None)
+            return best_score
+        if best_score >= beta:
+            bound = LOWER
+        elif best_score > start_alpha:
+            bound = EXACT
+        else:
+            bound = UPPER
+        self.table.store(key, depth, to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def _quiesce(self, position, alpha: int, beta: int) -> int:
+        """
+        Searches only captures until the position is quiet, so a score is
+        never taken in the middle of a trade
+        Parameters:
+            position (Position): position to score
+            alpha (int): score the side to move is already sure of
+            beta (int): score the other side is already sure of
+        Returns:
+            (int): score for the side to move
+        """
+        self._tick()
+        # The side to move can usually do at least as well as standing still
+        score = evaluate(position)
+        if score >= beta:
+            return score
+        if score > alpha:
+            alpha = score
+        color = position.side
+        enemy = position.occupied[1 - color]
+        captures = [(start, end) for start in bitboard.squares(position.occupied[color])
+                    for end in bitboard.squares(position.targets(start) & enemy)]
+        if self.orderer is not None:
+            captures = self.orderer.order_captures(position, captures)
+        for number, (start, end) in enumerate(captures):
+            record = position.make(start, end)
+            if position.in_check(color):
+                position.unmake(record)
+                continue
+            score = -self._quiesce(position, -beta, -alpha)
+            position.unmake(record)
+            if score >= beta:
+                self.cutoffs += 1
+                if number == 0:
+                    self.first_cutoffs += 1
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+
+def compare(position, depth: int) -> None:
+    """
+    Searches a position to a fixed depth without and then with move
+    ordering, each with a new table, and prints the nodes and cutoffs
+    Parameters:
+        position (Position): position to search
+        depth (int): plies to search
+    """
+    for ordering in (False, True):
+        engine = Engine(depth, None, ordering=ordering)
+        start = time.perf_counter()
+        move = engine.search(position)
+        seconds = time.perf_counter() - start
+        name = bitboard.move_name(move) if move is not None else 'none'
+        print(f"{'ordered' if ordering else 'unordered':>9}: best {name} score {engine.score}, "
+              f"{engine.nodes} nodes, {engine.cutoffs} cutoffs "
+              f"({engine.first_cutoffs / max(engine.cutoffs, 1):.1%} on the first move), "
+              f"{seconds:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search a position and print what the engine finds.')
+    parser.add_argument('--fen', default=bitboard.START_FEN)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--time', type=float, help='seconds to search, no limit if left out')
+    parser.add_argument('--compare', action='store_true',
+                        help='search to the depth with and without move ordering and compare')
+    args = parser.parse_args()
+    position = Position.from_fen(args.fen)
+    if args.compare:
+        compare(position, args.depth)
+        return
+    engine = Engine(args.depth, args.time)
+    start = time.perf_counter()
+    move = engine.search(position)
+    seconds = time.perf_counter() - start
+    if move is None:
+        print('No legal moves')
+        return
+    line = ' '.join(bitboard.move_name(step) for step in engine.principal_variation(position))
+    print(f"best {bitboard.move_name(move)} score {engine.score} depth {engine.completed_depth}")
+    print(f"line {line}")
+    print(f"{engine.nodes} nodes in {seconds:.2f}s, {engine.nodes / max(seconds, 1e-9):.0f} nodes/s")
+    stats = engine.table.stats()
+    print(f"table: {stats['hits']}/{stats['probes']} hits ({stats['hit_rate']:.1%}), "
+          f"{stats['stores']} stores, {stats['overwrites']} overwrites, "
+          f"{stats['rejected']} rejected, {stats['used']:.1%} used of {stats['size']}")
+    if engine.tablebase_hits:
+        print(f"tablebases: {engine.tablebase_hits} positions looked up")
+    print(f"cutoffs: {engine.cutoffs}, {engine.first_cutoffs / max(engine.cutoffs, 1):.1%} "
+          f"on the first move")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,17 @@
 # Created by Clay Beal
 # - in association with Zachary Bauer
 from typing import Optional
-import random
 
 from piece_model import Color, Rook, King, Knight, Queen, Bishop, Pawn, Piece
+import bitboard
+from bitboard import Position
+from engine import Engine, MATE, TERMINAL_DEPTH
+from book import OpeningBook
+from tt import EXACT
+
+# Bitboard kind of each piece class
+_KINDS = {Pawn: bitboard.PAWN, Knight: bitboard.KNIGHT, Bishop: bitboard.BISHOP,
+          Rook: bitboard.ROOK, Queen: bitboard.QUEEN, King: bitboard.KING}
 
 
 class Game:
@@ -15,23 +23,38 @@ class Game:
     prior states of the board
     Attributes:
         _board (list): Holds the current 2-d list of pieces on the board
+        _position (Position): Bitboards of the same pieces, kept in step
+                              with _board and used to answer queries
         current_player (Enum): Holds the color enum for the current player
-        _prior_states (list): Holds the prior states of the board via stack
+        _prior_states (list): Holds the undo records of the moves made so
+                              far via stack
+        engine (Engine): search the computer player uses
+        book (OpeningBook): opening moves the computer plays without
+                            searching, None to always search
     """
-    def __init__(self) -> None:
+    def __init__(self, engine: Engine = None, book: OpeningBook = None) -> None:
         """
         Creates the board, sets up the pieces, sets the color to white, and
         creates the prior stack
+        Parameters:
+            engine (Engine): search for the computer player, a 4 ply search
+                             limited to a second a move if None
+            book (OpeningBook): opening book, the one in book.bin (if it is
+                                there) if None
         """
         self._board = self._setup_pieces()
+        self._position = self._position_from_board()
         self.current_player = Color.WHITE
         self._prior_states = []
+        self.engine = engine if engine is not None else Engine()
+        self.book = book if book is not None else OpeningBook.default()
 
     def reset(self) -> None:
         """
         Resets the game to the state it was initialized as
         """
         self._board = self._setup_pieces()
+        self._position = self._position_from_board()
         self.current_player = Color.WHITE
         self._prior_states = []
 
@@ -136,6 +159,91 @@ class Game:
             [R1, K1, B1, Q1, king2, B2, K2, R2]
         ]
 
+    def _position_from_board(self) -> Position:
+        """
+        Builds the bitboards for the pieces on _board
+        Returns:
+            (Position): position holding the same pieces
+        """
+        position = Position()
+        for i in range(8):
+            for j in range(8):
+                piece = self._board[i][j]
+                if piece is not None:
+                    position.put(i * 8 + j, piece.color.value, _KINDS[type(piece)])
+        return position
+
+    def load_position(self, position: Position) -> None:
+        """
+        Sets the game up from a position, like one read from FEN.  Pawns off
+        their starting row count as having moved and the move history is
+        cleared
+        Parameters:
+            position (Position): position to play from
+        """
+        classes = {kind: piece for piece, kind in _KINDS.items()}
+        self._board = [[None for _ in range(8)] for _ in range(8)]
+        for square in bitboard.squares(position.all):
+            color, kind = position.piece_at(square)
+            piece = classes[kind](Color(color))
+            piece._game = self
+            if kind == bitboard.PAWN:
+                piece.moved = square >> 3 != bitboard.PAWN_START[color]
+            self._board[square >> 3][square & 7] = piece
+        self._position = position.copy()
+        self.current_player = Color(position.side)
+        self._prior_states = []
+
+    def _make(self, y: int, x: int, y2: int, x2: int) -> tuple:
+        """
+        Moves the piece at (y, x) to (y2, x2) on both the board and the
+        position, promoting pawns, without checking anything
+        Parameters:
+            y (int): current piece y coordinate
+            x (int): current piece x coordinate
+            y2 (int): desired piece y coordinate
+            x2 (int): desired piece x coordinate
+        Returns:
+            (tuple): undo record (y, x, y2, x2, moved piece, captured piece,
+                     pawn moved flag, current player, position record)
+        """
+        piece = self._board[y][x]
+        captured = self._board[y2][x2]
+        moved = piece.moved if isinstance(piece, Pawn) else None
+        record = (y, x, y2, x2, piece, captured, moved, self.current_player,
+                  self._position.make(y * 8 + x, y2 * 8 + x2))
+        self._board[y2][x2] = piece
+        self._board[y][x] = None
+        if isinstance(piece, Pawn):
+            # Have to keep track if a pawn has moved at least once
+            piece.moved = True
+            # Promote to Queen if pawn reaches opposite side of board
+            if y2 == (0 if piece.color == Color.WHITE else 7):
+                queen = Queen(piece.color)
+                queen._game = self
+                self._board[y2][x2] = queen
+        return record
+
+    def _unmake(self, record: tuple) -> None:
+        """
+        Takes back a move made with _make
+        Parameters:
+            record (tuple): undo record _make returned
+        """
+        y, x, y2, x2, piece, captured, moved, player, position_record = record
+        self._board[y][x] = piece
+        self._board[y2][x2] = captured
+        if moved is not None:
+            piece.moved = moved
+        self.current_player = player
+        self._position.unmake(position_record)
+
+    def _take_back(self) -> None:
+        """
+        Takes back the last move on the stack
+        """
+        self._unmake(self._prior_states.pop())
+
     def get(self, y: int, x: int) -> Optional[Piece]:
         """
         Will return the piece object when given a coordinate
@@ -164,31 +272,15 @@ class Game:
         """
         Undoes the board twice (1 move from both pieces)
         Returns:
-            (bool): True upon completion
+            (bool): True upon completion, False if there weren't two moves
+                    to undo
         """
+        if len(self._prior_states) < 2:
+            return False
         for _ in range(2):
-            previous_board = self._prior_states.pop()
-            self._board = previous_board
+            self._take_back()
         return True
 
-    def copy_board(self):
-        """
-        Preforms a deepcopy of the board to put on the stack after moves
-        have been made
-        _copy (list): a deepcopy of the board after a move has been made
-        """
-        self._copy = [[None for _ in range(8)] for _ in range(8)]
-        # Loops over the entire current board and copies each piece onto a
-        # new board
-        for i in range(8):
-            for j in range(8):
-                if self._board[i][j] is not None:
-                    new_piece = self._board[i][j].copy()
-                    new_piece._game = self
-                    self._copy[i][j] = new_piece
-
-        return self._copy
-
     def move(self, piece: Piece, y: int, x: int, y2: int, x2: int) -> bool:
         """
         This function will move a designated piece to a new specific location
@@ -204,31 +296,13 @@ class Game:
             (bool) - True if the move did not put the user in check, otherwise
                      False
         """
-        self._prior_states.append(self.copy_board())
-
-        self._board[y2][x2] = self._board[y][x]
-        self._board[y][x] = None
-        # Have to keep track if a pawn has moved at least once
-        if isinstance(piece, Pawn):
-            piece.moved = True
+        record = self._make(y, x, y2, x2)
         # If the move put you in check, undo it and return False
         if self.check(piece.color):
-            previous_board = self._prior_states.pop()
-            self._board = previous_board
+            self._unmake(record)
             return False
 
-        # Promote to Queen if pawn reaches opposite side of board
-        if isinstance(piece, Pawn) and piece.color == Color.WHITE:
-            for i in range(8):
-                if self._board[0][i] == piece:
-                    self._board[0][i] = Queen(Color.WHITE)
-                    self._board[0][i]._game = self
-        if isinstance(piece, Pawn) and piece.color == Color.BLACK:
-            for i in range(8):
-                if self._board[7][i] == piece:
-                    self._board[7][i] = Queen(Color.BLACK)
-                    self._board[7][i]._game = self
-
+        self._prior_states.append(record)
         self.switch_player()
         return True
 
@@ -241,13 +315,9 @@ class Game:
             piece_locations (list): list of tuples holding the piece locations
                                     from the passed in color
         """
-        piece_locations = []
-        for i in range(len(self._board)):
-            for j in range(len(self._board)):
-                if self._board[i][j] is not None:
-                    if self._board[i][j].color == color:
-                        piece_locations.append((i, j))
-        return piece_locations
+        # Sorted squares are row by row like the board
+        return [divmod(square, 8) for square in
+                sorted(self._position.piece_squares[color.value])]
 
     def find_king(self, color: Color) -> tuple[int, int]:
         """
@@ -257,11 +327,21 @@ class Game:
         Returns:
             (tuple): king coordinated in form of tuple
         """
-        for i in range(len(self._board)):
-            for j in range(len(self._board)):
-                if isinstance(self._board[i][j], King):
-                    if self._board[i][j].color == color:
-                        return (i, j)
+        square = self._position.king_square(color.value)
+        if square is not None:
+            return divmod(square, 8)
+
+    def legal_moves(self, color: Color) -> list[tuple[int, int, int, int]]:
+        """
+        Gets every move of one color that doesn't leave its king in check
+        Parameters:
+            color (Color): color to get moves for
+        Returns:
+            (list): (y, x, y2, x2) tuples from each piece's square to where
+                    it can move
+        """
+        return [divmod(start, 8) + divmod(end, 8)
+                for start, end in self._position.legal_moves(color.value)]
 
     def check(self, color: Color) -> bool:
         """
@@ -271,28 +351,9 @@ class Game:
         Returns:
             (bool): True if king in check, otherwise False
         """
-        # Gets piece locations from passed in color
-        valid_moves = []
-        # Locations are a list of tuples
-        if color == Color.WHITE:
-            piece_locations = self.get_piece_locations(Color.BLACK)
-        else:
-            piece_locations = self.get_piece_locations(Color.WHITE)
-
-        # Gets the valid moves for the passed in colors pieces
-        for i in piece_locations:
-            # "i" is the first tuple
-            valid_moves += self._board[i[0]][i[1]].valid_moves(i[0], i[1])
-
-        # If the king of one color is in the valid moves of the other color
-        # then they are in check
-        if color == Color.WHITE:
-            if self.find_king(Color.WHITE) in valid_moves:
-                return True
-        if color == Color.BLACK:
-            if self.find_king(Color.BLACK) in valid_moves:
-                return True
-        return False
+        # Looks at the squares attacking the king instead of building every
+        # enemy move
+        return self._position.in_check(color.value)
 
     def mate(self, color) -> bool:
         """
@@ -302,271 +363,65 @@ class Game:
         Returns:
             (bool): True if king in checkmate, otherwise False
         """
-        if color == Color.BLACK:
-            attacker_color = Color.WHITE
-        else:
-            attacker_color = Color.BLACK
-
         # if the king is not in check then it is not in checkmate
         if not self.check(color):
             return False
 
-        # Gets the kings space tuple
-        king_space = self.find_king(color)
-        # Gets king object
-        king = self._board[king_space[0]][king_space[1]]
-        # Gets valid moves for the king
-        king_moves = king.valid_moves(king_space[0], king_space[1])
-
-        # Gets a list of the attackers valid moves
-        attacker_moves = []
-        attacker_pieces = self.get_piece_locations(attacker_color)
-        for i in attacker_pieces:
-            attacker_moves += self.get(i[0], i[1]).valid_moves(i[0], i[1])
-
-        # Checks to see if there is a defending queen move that isn't in the
-        # list of attacker moves
-        for j in king_moves:
-            if j not in attacker_moves:
-                # If the king has a valid move, try it to ensure that it will
-                # not put you in check
-                if self.move(king, king_space[0], king_space[1], j[0], j[1]):
-                    # Code gets here it the move worked, it undoes the move
-                    # and returns false beacause the king is not in checkmate
-                    previous_board = self._prior_states.pop()
-                    self._board = previous_board
-                    self.current_player = Color.WHITE
-                    return False
-
-        # My checkmate function gets here if there are no valid king moves
-        # Gets a list of defender moves
-        defender_moves = []
-        defender_pieces = self.get_piece_locations(color)
-        for r in defender_pieces:
-            defender_moves += self.get(r[0], r[1]).valid_moves(r[0], r[1])
-
-        # Goes through all the defender pieces
-        for k in defender_pieces:
-            # Gets a specific piece object
-            piece = self.get(k[0], k[1])
-            piece_moves = piece.valid_moves(k[0], k[1])
-            # Loops through that pieces valid moves
-            for m in piece_moves:
-                # Checks to see if the move is valid via move function
-                if self.move(piece, k[0], k[1], m[0], m[1]):
-                    # This means the move is valid so it undoes the move; False
-                    previous_board = self._prior_states.pop()
-                    self._board = previous_board
-                    self.current_player = Color.WHITE
-                    return False
+        # The engine's table may already know the answer: an entry with a
+        # best move means there is a way out, and an exact -MATE means mated
+        key = self._position.hash
+        if self._position.side != color.value:
+            key ^= bitboard.SIDE_KEY
+        table = self.engine.table
+        entry = table.probe(key)
+        if entry is not None:
+            if entry[4] is not None:
+                return False
+            if entry[3] == EXACT and entry[2] == -MATE:
+                return True
+
+        # One pass of the pin-aware generator instead of trying every move
+        # Only a mate is stored: the first legal move isn't a searched best
+        # move, so the engine mustn't find it in the table
+        if self._position.legal_moves(color.value):
+            return False
+        table.store(key, TERMINAL_DEPTH, -MATE, EXACT, None)
         return True
 
+    def _computer_position(self, color: Color = Color.BLACK) -> Position:
+        """
+        Parameters:
+            color (Color): side to move, black for the computer's own move
+                           and white for pondering on the player's
+        Returns:
+            (Position): copy of the position for the engine to search
+        """
+        position = self._position.copy()
+        position.set_side(color.value)
+        return position
+
+    def _play_computer_move(self, best) -> None:
+        """
+        Plays a move the engine found
+        Parameters:
+            best (tuple): (from square, to square), None if black had no
+                          legal move
+        """
+        if best is None:
+            return
+        y, x = divmod(best[0], 8)
+        y2, x2 = divmod(best[1], 8)
+        self.move(self._board[y][x], y, x, y2, x2)
+
     def _computer_move(self) -> None:
         """
-        AI that plays chess as the black pieces, it plays moves based on
-        priority of the piece in this order: checkmate, check, queen, bishop,
-        knight, rook, pawn, random
-        """
-        # Gets a list of moves for the AI
-        black_moves = []
-        b_piece_locations = self.get_piece_locations(Color.BLACK)
-        for sp in b_piece_locations:
-            black_moves += self._board[sp[0]][sp[1]].valid_moves(sp[0], sp[1])
-        # Gets a list of pieces for its opponent
-        w_piece_locations = self.get_piece_locations(Color.WHITE)
-
-        # Going to go through all the black piece locations, tuple by tuple
-        for black_tuple in b_piece_locations:
-            # Gets an object of a piece
-            current_piece = self._board[black_tuple[0]][black_tuple[1]]
-            # Gets a tuple that holds that pieces moves
-            its_moves = current_piece.valid_moves(black_tuple[0], black_tuple[1])
-            # Going to go through each of the current pieces moves
-            for j in its_moves:
-                # If the move returns True it worked; and the move has been made
-                if self.move(current_piece, black_tuple[0], black_tuple[1], j[0], j[1]):
-                    # If this move results in white being put in check then return
-                    if self.mate(Color.WHITE):
-                        return
-                    # If this move results in white not being put in check; undo the move
-                    # and continue from the previous state of the board
-                    else:
-                        previous_board = self._prior_states.pop()
-                        self._board = previous_board
-                        self.current_player = Color.BLACK
-
-        # Going to go through all the black piece locations, tuple by tuple
-        for black_tuple in b_piece_locations:
-            # Gets an object of a piece
-            current_piece = self._board[black_tuple[0]][black_tuple[1]]
-            # Gets a tuple that holds that pieces moves
-            its_moves = current_piece.valid_moves(black_tuple[0], black_tuple[1])
-            # Going to go through each of the current pieces moves
-            for j in its_moves:
-                # If the move returns True it worked; and the move has been made
-                if self.move(current_piece, black_tuple[0], black_tuple[1], j[0], j[1]):
-                    # If this move results in white being put in check then return
-                    if self.check(Color.WHITE):
-                        return
-                    # If this move results in white not being put in check; undo the move
-                    # and continue from the previous state of the board
-                    else:
-                        previous_board = self._prior_states.pop()
-                        self._board = previous_board
-                        self.current_player = Color.BLACK
-
-        # Checks to see if the AI can take a queen
-        queen_exists = False
-        # Checks if any of the user pieces are a queen object
-        for piece_tuple in w_piece_locations:
-            if isinstance(self.get(piece_tuple[0], piece_tuple[1]), Queen):
-                queen_location = (piece_tuple[0], piece_tuple[1])
-                queen_exists = True
-        # If the user has a queen object then it checks to see if its
-        # coordinates are in the list of black moves
-        if queen_exists:
-            if queen_location in black_moves:
-                # Looks for the piece who has the queens space as a valid move
-                for black_tuple in b_piece_locations:
-                    piece = self._board[black_tuple[0]][black_tuple[1]]
-                    # Get a list of tuples of available moves for a certain piece
-                    available_moves = piece.valid_moves(black_tuple[0], black_tuple[1])
-                    # Loops through each move of the current piece checking if
-                    # a queen is located there
-                    for i in available_moves:
-                        if isinstance(self.get(i[0], i[1]), Queen):
-                            # If the move is the space as the queen, make that move
-                            if self.move(piece, black_tuple[0], black_tuple[1], i[0], i[1]):
-                                return
-                            else:
-                                self.current_player = Color.BLACK
-
-        # Checks to see if AI can take a bishop
-        bishop_exists = False
-        # Checks if any of the user pieces are a bishop object
-        for piece_tuple in w_piece_locations:
-            if isinstance(self.get(piece_tuple[0], piece_tuple[1]), Bishop):
-                bishop_location = (piece_tuple[0], piece_tuple[1])
-                if bishop_location in black_moves:
-                    bishop_exists = True
-                    break
-        # If the user has a bishop object then it checks to see if its
-        # coordinates are in the list of black moves
-        if bishop_exists:
-            if bishop_location in black_moves:
-                # Looks for the piece who has the bishops space as a valid move
-                for black_tuple in b_piece_locations:
-                    piece = self._board[black_tuple[0]][black_tuple[1]]
-                    # Get a list of tuples of available moves for a certain piece
-                    available_moves = piece.valid_moves(black_tuple[0], black_tuple[1])
-                    # Loops through each move of the current piece checking if
-                    # a bishop is located there
-                    for i in available_moves:
-                        if isinstance(self.get(i[0], i[1]), Bishop):
-                            # If the move is the space as the bishop, make that move
-                            if self.move(piece, black_tuple[0], black_tuple[1], i[0], i[1]):
-                                return
-                            else:
-                                self.current_player = Color.BLACK
-
-        # Checks to see if AI can take a knight
-        knight_exists = False
-        # Checks if any of the user pieces are a knight object
-        for piece_tuple in w_piece_locations:
-            if isinstance(self.get(piece_tuple[0], piece_tuple[1]), Knight):
-                knight_location = (piece_tuple[0], piece_tuple[1])
-                if knight_location in black_moves:
-                    knight_exists = True
-                    break
-        # If the user has a knight object then it checks to see if its
-        # coordinates are in the list of black moves
-        if knight_exists:
-            if knight_location in black_moves:
-                # Looks for the piece who has the knights space as a valid move
-                for black_tuple in b_piece_locations:
-                    piece = self._board[black_tuple[0]][black_tuple[1]]
-                    # Get a list of tuples of available moves for a certain piece
-                    available_moves = piece.valid_moves(black_tuple[0], black_tuple[1])
-                    # Loops through each move of the current piece checking if
-                    # a knight is located there
-                    for i in available_moves:
-                        if isinstance(self.get(i[0], i[1]), Knight):
-                            # If the move is the space as the knight, make that move
-                            if self.move(piece, black_tuple[0], black_tuple[1], i[0], i[1]):
-                                return
-                            else:
-                                self.current_player = Color.BLACK
-
-        # Checks to see if AI can take a rook
-        rook_exists = False
-        # Checks if any of the user pieces are a rook object
-        for piece_tuple in w_piece_locations:
-            if isinstance(self.get(piece_tuple[0], piece_tuple[1]), Rook):
-                rook_location = (piece_tuple[0], piece_tuple[1])
-                if rook_location in black_moves:
-                    rook_exists = True
-                    break
-        # If the user has a rook object then it checks to see if its
-        # coordinates are in the list of black moves
-        if rook_exists:
-            if rook_location in black_moves:
-                # Looks for the piece who has the rooks space as a valid move
-                for black_tuple in b_piece_locations:
-                    piece = self._board[black_tuple[0]][black_tuple[1]]
-                    # Get a list of tuples of available moves for a certain piece
-                    available_moves = piece.valid_moves(black_tuple[0], black_tuple[1])
-                    # Loops through each move of the current piece checking if
-                    # a rook is located there
-                    for i in available_moves:
-                        if isinstance(self.get(i[0], i[1]), Rook):
-                            # If the move is the space as the rook, make that move
-                            if self.move(piece, black_tuple[0], black_tuple[1], i[0], i[1]):
-                                return
-                            else:
-                                self.current_player = Color.BLACK
-
-        # Checks to see if AI can take a pawn
-        pawn_exists = False
-        # Checks if any of the user pieces are a pawn object
-        for piece_tuple in w_piece_locations:
-            if isinstance(self.get(piece_tuple[0], piece_tuple[1]), Pawn):
-                pawn_location = (piece_tuple[0], piece_tuple[1])
-                if pawn_location in black_moves:
-                    pawn_exists = True
-                    break
-        # If the user has a pawn object then it checks to see if its
-        # coordinates are in the list of black moves
-        if pawn_exists:
-            if pawn_location in black_moves:
-                # Looks for the piece who has the pawns space as a valid move
-                for black_tuple in b_piece_locations:
-                    piece = self._board[black_tuple[0]][black_tuple[1]]
-                    # Get a list of tuples of available moves for a certain piece
-                    available_moves = piece.valid_moves(black_tuple[0], black_tuple[1])
-                    # Loops through each move of the current piece checking if
-                    # a pawn is located there
-                    for i in available_moves:
-                        if isinstance(self.get(i[0], i[1]), Pawn):
-                            # If the move is the space as the pawn, make that move
-                            if self.move(piece, black_tuple[0], black_tuple[1], i[0], i[1]):
-                                return
-                            else:
-                                self.current_player = Color.BLACK
-
-        # This generates a random move for the AI
-        # Gets a list of tuples of all the black pieces
-        pieces = self.get_piece_locations(Color.BLACK)
-        # While there are still piece tuples in the list
-        while pieces:
-            # Gets a tuple for a specific piece
-            piece_tuple = random.choice(pieces)
-            # Gets the piece object
-            piece = self.get(piece_tuple[0], piece_tuple[1])
-            # Get the pieces move
-            piece_moves = piece.valid_moves(piece_tuple[0], piece_tuple[1])
-            if piece_moves:
-                for m in piece_moves:
-                    # If the move worked then that is the chosen move
-                    if self.move(piece, piece_tuple[0], piece_tuple[1], m[0], m[1]):
-                        return
-            pieces.remove(piece_tuple)
+        AI that plays chess as the black pieces, it plays a move from the
+        opening book if it has one, otherwise the move the alpha-beta
+        search in engine.py likes best.  The GUI does the same in the
+        background with ai_worker.py instead
+        """
+        position = self._computer_position()
+        best = self.book.choose(position) if self.book is not None else None
+        if best is None:
+            best = self.engine.search(position)
+        self._play_computer_move(best)
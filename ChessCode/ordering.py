@@ -0,0 +1,134 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Move ordering for the search.  Alpha-beta cuts off the most when the best
+# move is tried first, so moves are sorted by how likely they are to be
+# good: the transposition table's move, then captures and promotions by
+# MVV-LVA (most valuable victim first, taken by the least valuable
+# attacker), then the killer moves of the ply (quiet moves that cut off in
+# a sibling position), then every other move by its history score (how
+# often that from-to move has cut off anywhere, weighted by depth).
+from bitboard import PAWN, QUEEN, PROMOTION_ROW
+
+TABLE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 28
+KILLER_SCORE = 1 << 26
+# History scores are halved when one passes this, so they stay below the
+# killers
+HISTORY_LIMIT = 1 << 24
+# Deepest ply killers are kept for
+MAX_PLY = 128
+
+
+class MoveOrderer:
+    """
+    Sorts moves and learns from the cutoffs the search reports
+    Attributes:
+        killers (list): two quiet moves per ply that last caused a cutoff
+        history (list): for each color, a score per from * 64 + to
+    """
+    def __init__(self) -> None:
+        """
+        Creates an orderer that knows nothing yet
+        """
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [[0] * 4096, [0] * 4096]
+
+    def new_search(self) -> None:
+        """
+        Forgets the killers, which belong to the last search's tree, and
+        halves the history so newer cutoffs count for more
+        """
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        for scores in self.history:
+            for move in range(4096):
+                scores[move] >>= 1
+
+    def _capture_score(self, position, start: int, end: int) -> int:
+        """
+        Parameters:
+            position (Position): position the move is made from
+            start (int): square moved from
+            end (int): square moved to
+        Returns:
+            (int): MVV-LVA score of a capture or promotion, 0 for a quiet
+                   move
+        """
+        mailbox = position.mailbox
+        attacker = mailbox[start] % 6
+        victim = mailbox[end]
+        if victim is not None:
+            return CAPTURE_SCORE + (victim % 6) * 8 + 7 - attacker
+        if attacker == PAWN and end >> 3 == PROMOTION_ROW[position.side]:
+            return CAPTURE_SCORE + QUEEN * 8
+        return 0
+
+    def order(self, position, moves: list, table_move, ply: int) -> list:
+        """
+        Sorts moves, most promising first
+        Parameters:
+            position (Position): position the moves are made from
+            moves (list): (from square, to square) moves
+            table_move (tuple): best move stored in the transposition
+                                table, None if there isn't one
+            ply (int): plies from the top of the tree
+        Returns:
+            (list): the same moves, sorted
+        """
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        history = self.history[position.side]
+        scored = []
+        for move in moves:
+            start, end = move
+            if move == table_move:
+                score = TABLE_SCORE
+            else:
+                score = self._capture_score(position, start, end)
+                if not score:
+                    if move == killers[0]:
+                        score = KILLER_SCORE + 1
+                    elif move == killers[1]:
+                        score = KILLER_SCORE
+                    else:
+                        score = history[start * 64 + end]
+            scored.append((score, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def order_captures(self, position, moves: list) -> list:
+        """
+        Sorts captures by MVV-LVA, for the quiescence search
+        Parameters:
+            position (Position): position the captures are made from
+            moves (list): (from square, to square) captures
+        Returns:
+            (list): the same moves, sorted
+        """
+        return sorted(moves, key=lambda move: self._capture_score(position, *move),
+                      reverse=True)
+
+    def cutoff(self, position, move: tuple, depth: int, ply: int) -> None:
+        """
+        Records a move that caused a beta cutoff.  Captures and promotions
+        are already tried early, so only quiet moves are remembered
+        Parameters:
+            position (Position): position the move was made from
+            move (tuple): (from square, to square)
+            depth (int): plies that were left to search
+            ply (int): plies from the top of the tree
+        """
+        start, end = move
+        if self._capture_score(position, start, end):
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        history = self.history[position.side]
+        history[start * 64 + end] += depth * depth
+        if history[start * 64 + end] > HISTORY_LIMIT:
+            for index in range(4096):
+                history[index] >>= 1
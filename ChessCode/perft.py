@@ -0,0 +1,176 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Perft: counts every sequence of legal moves to a given depth.  The counts
+# are compared with known values to check move generation, and timing them
+# measures how fast it is.  The known values below leave out castling, en
+# passant and underpromotion (which this game doesn't have), so only
+# positions and depths where none of those can happen are listed.
+#
+#     python perft.py                          check every known value
+#     python perft.py --depth 4                count from the start position
+#     python perft.py --fen "..." --divide     count below each first move
+#     python perft.py --game --depth 3         count with Game.move instead
+#     python perft.py --verify                 check the indexes on every move
+import argparse
+import sys
+import time
+
+import bitboard
+from bitboard import Position
+from game import Game
+
+# (name, FEN, counts for depth 1, 2, ...)
+KNOWN = [
+    ('start', bitboard.START_FEN, [20, 400, 8902, 197281]),
+    # "Position 3", with the two en passant captures at depth 3 taken out
+    ('position 3', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', [14, 191, 2810]),
+    ('position 6', 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+     [46, 2079, 89890]),
+]
+
+
+def perft(position: Position, depth: int) -> int:
+    """
+    Counts the move sequences of a given length with the bitboard move
+    generator
+    Parameters:
+        position (Position): position to count from, left as it was
+        depth (int): plies to count
+    Returns:
+        (int): number of positions at that depth
+    """
+    color = position.side
+    if depth == 1:
+        return len(position.legal_moves(color))
+    nodes = 0
+    for start, end in position.legal_moves(color):
+        record = position.make(start, end)
+        nodes += perft(position, depth - 1)
+        position.unmake(record)
+    return nodes
+
+
+def game_perft(game: Game, depth: int) -> int:
+    """
+    Counts the move sequences of a given length the way the GUI finds
+    moves, with each piece's valid_moves and Game.move turning down moves
+    that leave the king in check
+    Parameters:
+        game (Game): game to count from, left as it was
+        depth (int): plies to count
+    Returns:
+        (int): number of positions at that depth
+    """
+    nodes = 0
+    for y, x in game.get_piece_locations(game.current_player):
+        piece = game.get(y, x)
+        for y2, x2 in piece.valid_moves(y, x):
+            if game.move(piece, y, x, y2, x2):
+                nodes += 1 if depth == 1 else game_perft(game, depth - 1)
+                game._take_back()
+    return nodes
+
+
+def counter(use_game: bool, fen: str):
+    """
+    Makes a function that runs perft from a position
+    Parameters:
+        use_game (bool): True to count with Game, False with bitboards
+        fen (str): position to count from
+    Returns:
+        (callable): called with a depth, returns the count
+    """
+    position = Position.from_fen(fen)
+    if not use_game:
+        return lambda depth: perft(position, depth)
+    game = Game()
+    game.load_position(position)
+    return lambda depth: game_perft(game, depth)
+
+
+def divide(fen: str, depth: int) -> dict:
+    """
+    Counts the move sequences below each legal first move, for finding
+    which move a wrong count comes from
+    Parameters:
+        fen (str): position to count from
+        depth (int): plies to count, including the first move
+    Returns:
+        (dict): move in coordinate notation to count
+    """
+    position = Position.from_fen(fen)
+    counts = {}
+    for move in position.legal_moves(position.side):
+        record = position.make(*move)
+        counts[bitboard.move_name(move)] = perft(position, depth - 1) if depth > 1 else 1
+        position.unmake(record)
+    return counts
+
+
+def timed(count, depth: int) -> tuple:
+    """
+    Parameters:
+        count (callable): perft function from counter
+        depth (int): plies to count
+    Returns:
+        (tuple): (count, seconds taken)
+    """
+    start = time.perf_counter()
+    nodes = count(depth)
+    return nodes, time.perf_counter() - start
+
+
+def check_known(use_game: bool, max_depth: int) -> bool:
+    """
+    Runs every known count up to a depth and prints how it went
+    Parameters:
+        use_game (bool): True to count with Game, False with bitboards
+        max_depth (int): deepest count to run
+    Returns:
+        (bool): True if every count matched
+    """
+    passed = True
+    for name, fen, expected in KNOWN:
+        count = counter(use_game, fen)
+        for depth, want in enumerate(expected[:max_depth], 1):
+            nodes, seconds = timed(count, depth)
+            status = 'ok' if nodes == want else 'WRONG, expected ' + str(want)
+            passed = passed and nodes == want
+            print(f"{name:>12} depth {depth}: {nodes:>9} nodes {seconds:8.2f}s "
+                  f"{nodes / max(seconds, 1e-9):>10.0f} nodes/s  {status}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count and time move generation.')
+    parser.add_argument('--fen', help='position to count from, checks the known values if left out')
+    parser.add_argument('--depth', type=int,
+                        help='plies to count, 3 if left out (the deepest checked without --fen)')
+    parser.add_argument('--divide', action='store_true', help='show the count below each first move')
+    parser.add_argument('--game', action='store_true',
+                        help='count with Piece.valid_moves and Game.move instead of bitboards')
+    parser.add_argument('--verify', action='store_true',
+                        help='check every index the position keeps after each move (slow)')
+    args = parser.parse_args()
+    Position.debug = args.verify
+
+    if args.fen is None and not args.divide and args.depth is None:
+        sys.exit(0 if check_known(args.game, 3) else 1)
+    fen = args.fen or bitboard.START_FEN
+    args.depth = args.depth or 3
+    if args.divide:
+        counts = divide(fen, args.depth)
+        for move in sorted(counts):
+            print(move + ': ' + str(counts[move]))
+        print('total: ' + str(sum(counts.values())))
+        return
+    nodes, seconds = timed(counter(args.game, fen), args.depth)
+    print(f"depth {args.depth}: {nodes} nodes in {seconds:.2f}s, "
+          f"{nodes / max(seconds, 1e-9):.0f} nodes/s")
+
+
+if __name__ == '__main__':
+    main()
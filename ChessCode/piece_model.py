@@ -4,7 +4,57 @@
 # - in association with Zachary Bauer
 from enum import Enum
 import abc
-import pygame
+
+
+# Steps for the directions pieces move in, in the order their moves are
+# listed: diagonals, then along the row, then along the column
+DIAGONALS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+HORIZONTALS = [(0, 1), (0, -1)]
+VERTICALS = [(1, 0), (-1, 0)]
+KNIGHT_STEPS = [(-2, -1), (-1, -2), (-2, 1), (1, -2), (2, -1), (-1, 2), (2, 1), (1, 2)]
+
+
+def _ray(y: int, x: int, y_d: int, x_d: int) -> list[tuple[int, int]]:
+    """
+    Lists the squares from a square to the edge of the board in one
+    direction, nearest first
+    Parameters:
+        y (int): y coordinate to start from, not included
+        x (int): x coordinate to start from, not included
+        y_d (int): step in the y coordinate
+        x_d (int): step in the x coordinate
+    Returns:
+        (list): (y, x) of each square passed over
+    """
+    squares = []
+    y, x = y + y_d, x + x_d
+    while 0 <= y < 8 and 0 <= x < 8:
+        squares.append((y, x))
+        y, x = y + y_d, x + x_d
+    return squares
+
+
+def _steps(steps: list) -> list:
+    """
+    Builds the squares one step away from each square
+    Parameters:
+        steps (list): (y, x) steps
+    Returns:
+        (list): 8 x 8 list of lists of the (y, x) squares on the board
+    """
+    return [[[(y + y_d, x + x_d) for y_d, x_d in steps
+              if 0 <= y + y_d < 8 and 0 <= x + x_d < 8]
+             for x in range(8)] for y in range(8)]
+
+
+# Built once at import, so finding moves is just walking these lists
+# RAYS[(y_d, x_d)][y][x]: squares from (y, x) to the edge of the board
+RAYS = {(y_d, x_d): [[_ray(y, x, y_d, x_d) for x in range(8)] for y in range(8)]
+        for y_d, x_d in DIAGONALS + HORIZONTALS + VERTICALS}
+KNIGHT_TARGETS = _steps(KNIGHT_STEPS)
+KING_TARGETS = _steps(DIAGONALS + HORIZONTALS + VERTICALS)
+# PAWN_CAPTURES[color value][y][x]: squares a pawn there can take on
+PAWN_CAPTURES = [_steps([(-1, -1), (-1, 1)]), _steps([(1, -1), (1, 1)])]
 
 
 class Color(Enum):
@@ -18,11 +68,9 @@ class Color(Enum):
 class Piece(abc.ABC):
     """
     Abstract Method
-    Blueprint to make the chess pieces and give them valid moves and images
+    Blueprint to make the chess pieces and give them valid moves.  Their
+    images live in sprites.py so the rules never need pygame
     """
-    # Static variable to hold images
-    image_path = 'images/pieces.png'
-    SPRITESHEET = pygame.image.load(image_path)
     # So pieces can keep track of the current game
     _game = None
 
@@ -41,8 +89,6 @@ class Piece(abc.ABC):
             color (Color): Color associated with the piece
         """
         self._color = color
-        # CHANGED THIS TO PYGAME.SRCALPHA
-        self._image = pygame.Surface((105, 105), pygame.SRCALPHA) # ???
 
     @property
     def color(self) -> Color:
@@ -53,19 +99,11 @@ class Piece(abc.ABC):
         """
         return self._color
 
-    def set_image(self, x: int, y: int) -> None:
+    def _ray_moves(self, y: int, x: int, y_d: int, x_d: int,
+                   distance: int) -> list[tuple[int, int]]:
         """
-        Sets the image of a piece at an x, y coordinate
-        x (int): x coordinate
-        y (int): y coordinate
-        """
-        self._image.blit(Piece.SPRITESHEET, (0,0),
-                         pygame.rect.Rect(x, y, 105, 105))
-
-    def _diagonal_moves(self, y: int, x: int, y_d: int, x_d: int,
-                        distance: int) -> list[tuple[int, int]]:
-        """
-        Gets the possible moves for a piece that can move diagonally
+        Gets the possible moves for a piece sliding in one direction, up to
+        and including the first piece in the way if it can be taken
         Parameters:
             y (int): current y coordinate of a piece
             x (int): current x coordinate of a piece
@@ -75,100 +113,33 @@ class Piece(abc.ABC):
         Returns:
             possible_moves (list): possible moves for a piece
         """
-        # Current location is (y, x)
         possible_moves = []
-        piece = self._game._board[y][x]
-        color = piece.color
-        try:
-            # This will be used to check number of spaces from the current
-            # piece we can use
-            for i in range(1, distance + 1):
-                # Need to check the board at this index and see if it's None
-                # current index + (direction * number of spaces)
-                # If the space is None add it to the possible moves
-                if (y + y_d * i) >= 0 and (x + x_d * i) >= 0:
-                    if self._game._board[y + y_d * i][x + x_d * i] is None:
-                        possible_moves.append((y + (y_d * i), x + (x_d * i)))
-                    elif self._game._board[y + y_d * i][x + x_d * i].color is not color:
-                        possible_moves.append((y + (y_d * i), x + (x_d * i)))
-                        return possible_moves
-                    else:
-                        return possible_moves
-        except IndexError:
-            pass
+        board = self._game._board
+        color = board[y][x].color
+        for y2, x2 in RAYS[(y_d, x_d)][y][x][:distance]:
+            target = board[y2][x2]
+            if target is None:
+                possible_moves.append((y2, x2))
+            else:
+                if target.color is not color:
+                    possible_moves.append((y2, x2))
+                break
         return possible_moves
 
-    def _horizontal_moves(self, y: int, x: int, y_d: int, x_d: int,
-                        distance: int) -> list[tuple[int, int]]:
+    def _step_moves(self, y: int, x: int, targets: list) -> list[tuple[int, int]]:
         """
-        Gets the possible moves for a piece that can move horizontally
+        Gets the possible moves for a piece that jumps to fixed squares
         Parameters:
             y (int): current y coordinate of a piece
             x (int): current x coordinate of a piece
-            y_d (int): direction you want to go with the y coordinate
-            x_d (int): direction you want to go with the x coordinate
-            distance (int): how many spaces the pieces can move
+            targets (list): table of the squares it can reach from each square
         Returns:
-            possible_moves (list): possible moves for a piece
+            (list): the squares that are empty or hold an enemy piece
         """
-        # Current location is (y,x)
-        possible_moves = []
-        piece = self._game._board[y][x]
-        color = piece.color
-        try:
-            # This will be used to check number of spaces from the current
-            # piece we can use
-            for i in range(1, distance + 1):
-                # Need to check the board at this index and see if it's None
-                # current index + (direction * number of spaces)
-                # If the space is None add it to the possible moves
-                if (x + x_d * i) >= 0:
-                    if self._game._board[y][x + x_d * i] is None:
-                        possible_moves.append((y, x + (x_d * i)))
-                    elif self._game._board[y][x + x_d * i].color is not color:
-                        possible_moves.append((y, x + (x_d * i)))
-                        return possible_moves
-                    else:
-                        return possible_moves
-        except IndexError:
-            pass
-        return possible_moves
-
-    def _vertical_moves(self, y: int, x: int, y_d: int, x_d: int,
-                        distance: int) -> list[tuple[int, int]]:
-        """
-        Gets the possible moves for a piece that can move vertically
-        Parameters:
-            y (int): current y coordinate of a piece
-            x (int): current x coordinate of a piece
-            y_d (int): direction you want to go with the y coordinate
-            x_d (int): direction you want to go with the x coordinate
-            distance (int): how many spaces the pieces can move
-        Returns:
-            possible_moves (list): possible moves for a piece
-        """
-        # Current location is (y,x)
-        possible_moves = []
-        piece = self._game._board[y][x]
-        color = piece.color
-        try:
-            # This will be used to check number of spaces from the current
-            # piece we can use
-            for i in range(1, distance + 1):
-                # Need to check the board at this index and see if it's None
-                # current index + (direction * number of spaces)
-                # If the space is None add it to the list of possible moves
-                if (y + y_d * i) >= 0:
-                    if self._game._board[y + y_d * i][x] is None:
-                        possible_moves.append((y + (y_d * i), x))
-                    elif self._game._board[y + y_d * i][x].color is not color:
-                        possible_moves.append((y + (y_d * i), x))
-                        return possible_moves
-                    else:
-                        return possible_moves
-        except IndexError:
-            pass
-        return possible_moves
+        board = self._game._board
+        color = board[y][x].color
+        return [(y2, x2) for y2, x2 in targets[y][x]
+                if board[y2][x2] is None or board[y2][x2].color is not color]
 
     def get_diagonal_moves(self, y: int, x: int, distance: int) -> list[tuple[int, int]]:
         """
@@ -180,11 +151,10 @@ class Piece(abc.ABC):
         Returns:
             (list): of all the total moves
         """
-        moves1 = self._diagonal_moves(y, x, -1, -1, distance)
-        moves2 = self._diagonal_moves(y, x, -1, 1, distance)
-        moves3 = self._diagonal_moves(y, x, 1, -1, distance)
-        moves4 = self._diagonal_moves(y, x, 1, 1, distance)
-        return moves1 + moves2 + moves3 + moves4
+        moves = []
+        for y_d, x_d in DIAGONALS:
+            moves += self._ray_moves(y, x, y_d, x_d, distance)
+        return moves
 
     def get_horizontal_moves(self, y: int, x: int, distance: int) -> list[tuple[int, int]]:
         """
@@ -196,9 +166,10 @@ class Piece(abc.ABC):
         Returns:
             (list): of all the total moves
         """
-        moves1 = self._horizontal_moves(y, x, 1, 1, distance)
-        moves2 = self._horizontal_moves(y, x, 1, -1, distance)
-        return moves1 + moves2
+        moves = []
+        for y_d, x_d in HORIZONTALS:
+            moves += self._ray_moves(y, x, y_d, x_d, distance)
+        return moves
 
     def get_vertical_moves(self, y: int, x: int, distance: int) -> list[tuple[int, int]]:
         """
@@ -210,9 +181,10 @@ class Piece(abc.ABC):
         Returns:
             (list): of all the total moves
         """
-        moves1 = self._vertical_moves(y, x, 1, 1, distance)
-        moves2 = self._vertical_moves(y, x, -1, 1, distance)
-        return moves1 + moves2
+        moves = []
+        for y_d, x_d in VERTICALS:
+            moves += self._ray_moves(y, x, y_d, x_d, distance)
+        return moves
 
     @abc.abstractmethod
     def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
@@ -242,11 +214,6 @@ class King(Piece):
             color (Color): The color of the king
         """
         super().__init__(color)
-        # Sets the image for black and white king
-        if self.color == Color.WHITE:
-            self.set_image(0,0)
-        else:
-            self.set_image(0, 104)
 
     def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
         """
@@ -257,12 +224,8 @@ class King(Piece):
         Returns:
             (list): of valid king moves
         """
-        # Gets the diagonal, horizontal and vertical moves
-        # Returns them all in one big valid moves list
-        diag_moves = self.get_diagonal_moves(y, x, 1)
-        horizontal_moves = self.get_horizontal_moves(y, x, 1)
-        vertical_moves = self.get_vertical_moves(y, x, 1)
-        return diag_moves + horizontal_moves + vertical_moves
+        # One step in any direction, looked up instead of walked
+        return self._step_moves(y, x, KING_TARGETS)
 
     def copy(self):
         """
@@ -282,11 +245,6 @@ class Queen(Piece):
     """
     def __init__(self, color: Color):
         super().__init__(color)
-        # Sets image for black and white queen
-        if self.color == color.WHITE:
-            self.set_image(104, 0)
-        else:
-            self.set_image(104, 104)
 
     def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
         """
@@ -322,11 +280,6 @@ class Bishop(Piece):
     """
     def __init__(self, color: Color):
         super().__init__(color)
-        # Sets the image for a black and white bishop
-        if self.color == color.WHITE:
-            self.set_image(210, 0)
-        else:
-            self.set_image(210, 104)
 
     def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
         """
@@ -359,11 +312,6 @@ class Rook(Piece):
     """
     def __init__(self, color: Color):
         super().__init__(color)
-        # Sets the image for a black and white rook
-        if self.color == color.WHITE:
-            self.set_image(420, 0)
-        else:
-            self.set_image(420, 104)
 
     def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
         """
@@ -397,11 +345,6 @@ class Knight(Piece):
     """
     def __init__(self, color: Color):
         super().__init__(color)
-        # Sets the image for a black and white knight
-        if self.color == color.WHITE:
-            self.set_image(312, 0)
-        else:
-            self.set_image(312, 104)
 
     def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
         """
@@ -412,31 +355,9 @@ class Knight(Piece):
         Returns:
             (list): of valid knight moves
         """
-        valid_moves = []
-        piece = self._game._board[y][x]
-        color = piece.color
-        # This is checking the spaces that are either two up/down
-        # or two left/right from the current space
-        for i in range(-2, 3, 4):
-            # This is checking the spaces that are either one up/down
-            # or one left/right from the current space
-            for j in range(-1, 2, 2):
-                # If this space on the board is not occupied it is a valid move
-                # It is also a valid move if it is a piece of the opposite color
-                if (0 <= (y + i) < 8) and (0 <= (x + j) < 8) and\
-                        self._game._board[y + i][x + j] is None:
-                    valid_moves.append((y + i, x + j))
-                elif (0 <= (y + i) < 8) and (0 <= (x + j) < 8) and\
-                    self._game._board[y + i][x + j].color is not color:
-                    valid_moves.append((y + i, x + j))
-
-                if (0 <= (x + i) < 8) and (0 <= (y + j) < 8) and\
-                        self._game._board[y + j][x + i] is None:
-                    valid_moves.append((y + j, x + i))
-                elif (0 <= (x + i) < 8) and (0 <= (y + j) < 8) and\
-                    self._game._board[y + j][x + i].color is not color:
-                    valid_moves.append((y + j, x + i))
-        return valid_moves
+        # The squares a knight jumps to from each square are worked out
+        # once at import
+        return self._step_moves(y, x, KNIGHT_TARGETS)
 
     def copy(self):
         """
@@ -456,11 +377,6 @@ class Pawn(Piece):
     """
     def __init__(self, color: Color):
         super().__init__(color)
-        # Sets image for a black and white pawn
-        if self.color == color.WHITE:
-            self.set_image(530,0)
-        else:
-            self.set_image(530, 104)
         self.moved = False
 
     def valid_moves(self, y: int, x: int) -> list[tuple[int, int]]:
@@ -473,83 +389,19 @@ class Pawn(Piece):
             (list): of valid pawn moves
         """
         valid_moves = []
-        piece = self._game._board[y][x]
-        color = piece.color
-        # This works for the first move for the pawns
-        # Black pawns can move down the board and twice on their first move
-        if not self.moved and self.color == Color.BLACK:
-            for i in range(1, 3):
-                try:
-                    # If the space in front of them is occupied
-                    if self._game._board[y+i][x] is not None:
-                        break
-                    else:
-                        valid_moves.append((y + i, x))
-                except IndexError:
-                    pass
-
-            for j in range(-1, 2, 2):
-                try:
-                    if self._game._board[y+1][x+j] is not None and (x+j) != -1:
-                        # If the space diagonal to them is a piece of the opposite color
-                        if self._game._board[y+1][x+j].color is not color:
-                            valid_moves.append((y+1, x+j))
-                except IndexError:
-                    pass
-
-        # White pawns can move up the board and twice on their first move
-        elif not self.moved and self.color == Color.WHITE:
-            for i in range(1, 3):
-                try:
-                    # If the space in front of them is occupied
-                    if self._game._board[y - i][x] is not None:
-                        break
-                    else:
-                        valid_moves.append((y - i, x))
-                except IndexError:
-                    pass
-
-            for j in range(-1, 2, 2):
-                try:
-                    if self._game._board[y-1][x+j] is not None:
-                        # If the space diagonal to them is a piece of the opposite color
-                        if self._game._board[y-1][x+j].color is not color:
-                            valid_moves.append((y-1, x+j))
-                except IndexError:
-                    pass
-
-        # If the pawn has already moved once then it can only move one space up
-        elif self.moved and self.color == Color.BLACK:
-            for j in range(-1, 2, 2):
-                try:
-                    if self._game._board[y+1][x+j] is not None and (x+j) != -1:
-                        # If the space diagonal to them is a piece of the opposite color
-                        if self._game._board[y+1][x+j].color is not color:
-                            valid_moves.append((y+1, x+j))
-                except IndexError:
-                    pass
-            try:
-                # If the space in front of them is not occupied
-                if self._game._board[y+1][x] is None:
-                    valid_moves.append((y+1, x))
-            except IndexError:
-                pass
-
-        elif self.moved and self.color == Color.WHITE:
-            for j in range(-1, 2, 2):
-                try:
-                    if self._game._board[y-1][x+j] is not None:
-                        # If the space diagonal to them is a piece of the opposite color
-                        if self._game._board[y-1][x+j].color is not color:
-                            valid_moves.append((y-1, x+j))
-                except IndexError:
-                    pass
-            try:
-                # If the space in front of them is not occupied
-                if self._game._board[y-1][x] is None:
-                    valid_moves.append((y-1, x))
-            except IndexError:
-                pass
+        board = self._game._board
+        color = self.color
+        # Black pawns move down the board and white pawns up, two spaces
+        # if they haven't moved yet, stopping at the first piece in the way
+        forward = (1, 0) if color == Color.BLACK else (-1, 0)
+        for y2, x2 in RAYS[forward][y][x][:1 if self.moved else 2]:
+            if board[y2][x2] is not None:
+                break
+            valid_moves.append((y2, x2))
+        # If the space diagonal to them is a piece of the opposite color
+        for y2, x2 in PAWN_CAPTURES[color.value][y][x]:
+            if board[y2][x2] is not None and board[y2][x2].color is not color:
+                valid_moves.append((y2, x2))
         return valid_moves
 
     def copy(self):
@@ -0,0 +1,47 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Piece images for the GUI.  This is the only part of the chess code besides
+# chess_gui_view.py that needs pygame: the spritesheet is loaded the first
+# time a piece is drawn, and each (piece class, color) picture is cut from it
+# once and shared.
+import os
+
+import pygame
+
+from piece_model import Color, King, Queen, Bishop, Knight, Rook, Pawn
+
+IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'images', 'pieces.png')
+# Column of each piece's picture on the spritesheet
+SPRITE_COLUMNS = {King: 0, Queen: 104, Bishop: 210, Knight: 312, Rook: 420,
+                  Pawn: 530}
+
+_spritesheet = None
+_images = {}
+
+
+def piece_image(piece) -> pygame.Surface:
+    """
+    Gets the picture of a piece, shared with every other piece of the same
+    type and color
+    Parameters:
+        piece (Piece): piece to draw
+    Returns:
+        (Surface): 105 x 105 picture of the piece
+    """
+    global _spritesheet
+    key = (type(piece), piece.color)
+    image = _images.get(key)
+    if image is None:
+        if _spritesheet is None:
+            _spritesheet = pygame.image.load(IMAGE_PATH)
+        # White pieces are on the top row of the spritesheet
+        y = 0 if piece.color == Color.WHITE else 104
+        image = pygame.Surface((105, 105), pygame.SRCALPHA)
+        image.blit(_spritesheet, (0, 0),
+                   pygame.rect.Rect(SPRITE_COLUMNS[type(piece)], y, 105, 105))
+        _images[key] = image
+    return image
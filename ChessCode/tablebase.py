@@ -0,0 +1,281 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Endgame tablebases: the distance to mate of every position with a king
+# and one queen, rook or pawn against a lone king, worked out backwards from
+# the mates (retrograde analysis) with the bitboard move generator.  Each
+# table is a file of one byte per position, indexed by
+#
+#     ((side to move * 64 + strong king) * 64 + weak king) * 64 + piece
+#
+# with white as the strong side and side to move 0 for white.  The byte is
+# 0 for a draw (or a position that can't happen) and otherwise the number
+# of plies to mate plus one: a win for white to move, a loss for black to
+# move.  Positions where black has the piece are looked up with the board
+# flipped.  The engine maps the files into memory and probes them during
+# search.  Pawns only promote to queens here, so KPK is built after KQK.
+#
+#     python tablebase.py                      build kqk, krk and kpk
+#     python tablebase.py --show "FEN"         look a position up
+import argparse
+import mmap
+import os
+import time
+from array import array
+
+import bitboard
+from bitboard import Position, WHITE, BLACK, PAWN, ROOK, QUEEN, KING
+
+DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebases')
+# Table name for the strong side's piece, in the order they have to be built
+TABLES = {QUEEN: 'kqk', ROOK: 'krk', PAWN: 'kpk'}
+SIZE = 2 * 64 * 64 * 64
+# Indexes from here on have the weak side to move
+HALF = SIZE // 2
+
+
+def index(side: int, strong_king: int, weak_king: int, piece: int) -> int:
+    """
+    Parameters:
+        side (int): 0 if the strong side is to move, 1 if the weak side is
+        strong_king (int): square of the king with the piece
+        weak_king (int): square of the lone king
+        piece (int): square of the queen, rook or pawn
+    Returns:
+        (int): index of the position in a table
+    """
+    return ((side * 64 + strong_king) * 64 + weak_king) * 64 + piece
+
+
+def generate(kind: int, queen_table=None, report=None) -> bytearray:
+    """
+    Builds a table.  Every position is set up once to find its moves, and
+    each move is remembered backwards (which positions lead to which).
+    Then, starting from the mates, a position with the weak side to move
+    is lost once every move from it leads to a win, and a position with
+    the strong side to move is won as soon as one move leads to a loss
+    Parameters:
+        kind (int): QUEEN, ROOK or PAWN
+        queen_table (bytes): the KQK table, which promotions lead into;
+                             needed for PAWN
+        report (callable): called with a line of progress text, if given
+    Returns:
+        (bytearray): the table
+    """
+    values = bytearray(SIZE)
+    # Moves left from each weak side to move position that haven't been
+    # found to lose.  A move taking the piece never counts down, so those
+    # positions are draws
+    remaining = bytearray(SIZE)
+    edge_from = array('l')
+    edge_to = array('l')
+    frontier = []
+    # Plies to a win through a promotion, to be added when the search from
+    # the mates gets that far
+    promotions = {}
+    position = Position()
+    for i in range(SIZE):
+        side, rest = divmod(i, HALF)
+        strong_king, rest = divmod(rest, 4096)
+        weak_king, piece = divmod(rest, 64)
+        if strong_king == weak_king or piece == strong_king or piece == weak_king:
+            continue
+        if kind == PAWN and piece >> 3 in bitboard.PROMOTION_ROW:
+            continue
+        position.put(strong_king, WHITE, KING)
+        position.put(weak_king, BLACK, KING)
+        position.put(piece, WHITE, kind)
+        position.set_side(side)
+        if not position.in_check(1 - side):
+            moves = position.legal_moves(side)
+            if not moves and position.in_check(side):
+                # Only the lone king can be mated
+                values[i] = 1
+                frontier.append(i)
+            elif side == BLACK:
+                remaining[i] = len(moves)
+                for start, end in moves:
+                    if end != piece:
+                        edge_from.append(i)
+                        edge_to.append(index(WHITE, strong_king, end, piece))
+            else:
+                for start, end in moves:
+                    if start == strong_king:
+                        edge_to.append(index(BLACK, end, weak_king, piece))
+                    elif kind == PAWN and end >> 3 == bitboard.PROMOTION_ROW[WHITE]:
+                        won = queen_table[index(BLACK, strong_king, weak_king, end)]
+                        if won:
+                            plies = won
+                            if i not in promotions or plies < promotions[i]:
+                                promotions[i] = plies
+                        continue
+                    else:
+                        edge_to.append(index(BLACK, strong_king, weak_king, end))
+                    edge_from.append(i)
+        position.remove(piece)
+        position.remove(weak_king)
+        position.remove(strong_king)
+    if report is not None:
+        report(f'  {len(edge_to)} moves found, {len(frontier)} mates')
+
+    # Predecessors of each position as one array, split by offsets
+    offsets = array('l', bytes(8 * (SIZE + 1)))
+    for j in edge_to:
+        offsets[j + 1] += 1
+    for j in range(SIZE):
+        offsets[j + 1] += offsets[j]
+    predecessors = array('l', bytes(8 * len(edge_to)))
+    filled = array('l', offsets)
+    for i, j in zip(edge_from, edge_to):
+        predecessors[filled[j]] = i
+        filled[j] += 1
+    del edge_from, edge_to, filled
+
+    pending = {}
+    for i, plies in promotions.items():
+        pending.setdefault(plies, []).append(i)
+    plies = 0
+    while frontier or pending:
+        for i in pending.pop(plies, []):
+            if not values[i]:
+                values[i] = plies + 1
+                frontier.append(i)
+        if plies + 2 > 255:
+            raise ValueError('Distance to mate too long for one byte')
+        found = []
+        for j in frontier:
+            for k in predecessors[offsets[j]:offsets[j + 1]]:
+                if values[k]:
+                    continue
+                if k >= HALF:
+                    remaining[k] -= 1
+                    if remaining[k]:
+                        continue
+                values[k] = plies + 2
+                found.append(k)
+        frontier = found
+        plies += 1
+    return values
+
+
+def write_table(values: bytes, path: str) -> None:
+    """
+    Parameters:
+        values (bytes): table from generate
+        path (str): file to write
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(values)
+
+
+class Tablebases:
+    """
+    The tablebase files found in a directory, mapped into memory
+    Attributes:
+        directory (str): where the files are
+        probes (int): lookups that found a table for the position
+    """
+    def __init__(self, directory: str = DIRECTORY) -> None:
+        """
+        Maps every table file the directory has, leaving out missing ones
+        Parameters:
+            directory (str): directory written by build
+        """
+        self.directory = directory
+        self.probes = 0
+        self._tables = {}
+        for kind, name in TABLES.items():
+            path = os.path.join(directory, name + '.tb')
+            if os.path.exists(path) and os.path.getsize(path) == SIZE:
+                with open(path, 'rb') as file:
+                    self._tables[kind] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __bool__(self) -> bool:
+        """
+        Returns:
+            (bool): True if any table was found
+        """
+        return bool(self._tables)
+
+    def close(self) -> None:
+        """
+        Unmaps the files
+        """
+        for table in self._tables.values():
+            table.close()
+        self._tables = {}
+
+    def probe(self, position: Position):
+        """
+        Looks up a position with two kings and one other piece
+        Parameters:
+            position (Position): position to look up
+        Returns:
+            (tuple): (result, plies): result 1 if the side to move mates in
+                     that many plies, -1 if it is mated in that many and 0
+                     for a draw.  None if there is no table for it
+        """
+        kings = position.kings
+        if None in kings or len(position.piece_squares[WHITE]) + \
+                len(position.piece_squares[BLACK]) != 3:
+            return None
+        piece = (position.all ^ 1 << kings[WHITE] ^ 1 << kings[BLACK]).bit_length() - 1
+        color, kind = position.piece_at(piece)
+        table = self._tables.get(kind)
+        if table is None:
+            return None
+        self.probes += 1
+        strong_to_move = position.side == color
+        side = 0 if strong_to_move else 1
+        if color == WHITE:
+            value = table[index(side, kings[WHITE], kings[BLACK], piece)]
+        else:
+            # Flip the board so the piece is white's
+            value = table[index(side, kings[BLACK] ^ 56, kings[WHITE] ^ 56, piece ^ 56)]
+        if not value:
+            return 0, 0
+        return (1 if strong_to_move else -1), value - 1
+
+
+def build(directory: str = DIRECTORY) -> None:
+    """
+    Builds every table and writes it to the directory, printing progress
+    Parameters:
+        directory (str): where to write the files
+    """
+    built = {}
+    for kind, name in TABLES.items():
+        start = time.perf_counter()
+        print(name + ':')
+        values = generate(kind, built.get(QUEEN), print)
+        built[kind] = values
+        write_table(values, os.path.join(directory, name + '.tb'))
+        white = values[:HALF]
+        wins = HALF - white.count(0)
+        print(f'  {wins} wins with white to move, longest mate {max(white) - 1} plies, '
+              f'{time.perf_counter() - start:.1f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or look in the endgame tablebases.')
+    parser.add_argument('--directory', default=DIRECTORY, help='where the table files go')
+    parser.add_argument('--show', metavar='FEN', help='look a position up instead of building')
+    args = parser.parse_args()
+
+    if args.show:
+        found = Tablebases(args.directory).probe(Position.from_fen(args.show))
+        if found is None:
+            print('not in the tables')
+        elif found[0] == 0:
+            print('draw')
+        else:
+            print(('wins' if found[0] > 0 else 'loses') + f' in {found[1]} plies')
+        return
+    build(args.directory)
+
+
+if __name__ == '__main__':
+    main()
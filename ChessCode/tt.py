@@ -0,0 +1,123 @@
+# Final Project - Chess - CIS 163
+# Prof. Ira Woodring
+# Created by Clay Beal
+# - in association with Zachary Bauer
+#
+# Transposition table: remembers what the search found out about positions
+# by their Zobrist hash, so a position reached again (often by playing the
+# same moves in a different order) doesn't have to be searched again.  It
+# has a fixed number of slots and each position can only go in one of them,
+# picked by the low bits of its hash.
+
+# How a stored score relates to the real one
+EXACT = 0
+LOWER = 1  # the real score is at least this (the search cut off)
+UPPER = 2  # the real score is at most this (no move beat alpha)
+
+
+class TranspositionTable:
+    """
+    Fixed size table of search results
+    Attributes:
+        size (int): number of slots, a power of two
+        generation (int): number of the current search, entries from
+                          older searches are the first to be replaced
+        probes (int): lookups made
+        hits (int): lookups that found the position
+        stores (int): entries written
+        overwrites (int): entries written over a different position
+        rejected (int): entries not written because the slot held a
+                        deeper result from this search
+    """
+    def __init__(self, size: int = 1 << 17) -> None:
+        """
+        Creates an empty table
+        Parameters:
+            size (int): number of slots, rounded down to a power of two
+        """
+        self.size = 1 << (size.bit_length() - 1)
+        self._mask = self.size - 1
+        # Each slot is (hash, depth, score, bound, move, generation)
+        self._slots = [None] * self.size
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """
+        Zeroes the counters
+        """
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.rejected = 0
+
+    def clear(self) -> None:
+        """
+        Empties every slot
+        """
+        self._slots = [None] * self.size
+
+    def new_search(self) -> None:
+        """
+        Marks the start of a search, so what is left from earlier searches
+        gives way to new results
+        """
+        self.generation += 1
+
+    def probe(self, key: int):
+        """
+        Looks a position up
+        Parameters:
+            key (int): Zobrist hash of the position
+        Returns:
+            (tuple): (hash, depth, score, bound, move, generation), None if
+                     the position isn't in the table
+        """
+        self.probes += 1
+        entry = self._slots[key & self._mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move) -> None:
+        """
+        Saves a search result.  A slot holding another position is only
+        written over if it is from an older search or was searched less deeply
+        Parameters:
+            key (int): Zobrist hash of the position
+            depth (int): plies the position was searched to
+            score (int): score found
+            bound (int): EXACT, LOWER or UPPER
+            move (tuple): best move found, None if there isn't one
+        """
+        index = key & self._mask
+        old = self._slots[index]
+        if old is not None and old[0] != key:
+            if old[5] == self.generation and old[1] > depth:
+                self.rejected += 1
+                return
+            self.overwrites += 1
+        elif old is not None and move is None:
+            # Keep the move from before, it is still the best one known
+            move = old[4]
+        self._slots[index] = (key, depth, score, bound, move, self.generation)
+        self.stores += 1
+
+    def used(self) -> float:
+        """
+        Returns:
+            (float): fraction of the slots that hold something
+        """
+        return (self.size - self._slots.count(None)) / self.size
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            (dict): the counters, the hit rate and how full the table is
+        """
+        return {'size': self.size, 'probes': self.probes, 'hits': self.hits,
+                'hit_rate': self.hits / self.probes if self.probes else 0.0,
+                'stores': self.stores, 'overwrites': self.overwrites,
+                'rejected': self.rejected, 'used': self.used()}
@@ -0,0 +1,149 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# Runs Game on asyncio instead of the blocking while loop.  Input polling,
+# simulation ticks, rendering and (optionally) writing stats to a CSV file
+# are separate tasks timed by the event loop, so the speed delay no longer
+# freezes the window and slow work like file writes runs off to the side.
+# AsyncGame.run() is a coroutine, so it can also be awaited from other
+# asyncio code.
+
+import asyncio
+import csv
+import time
+
+import pygame
+
+from game import Game
+
+
+class AsyncGame(Game):
+    """
+    Game driven by cooperating asyncio tasks
+
+    Attributes:
+        _fps (int): frames drawn per second
+        _stats_path (str): CSV file to append stats to, None for no stats
+        _stats_every (int): write a stats row every this many generations
+        _stats (asyncio.Queue): rows waiting to be written to the CSV file
+        _done (asyncio.Event): set when the window is closed
+    """
+    def __init__(self, fps: int = 60, stats_path: str = None,
+                 stats_every: int = 10):
+        """
+        Creates the game, see Game
+
+        Parameters:
+            fps (int): frames drawn per second
+            stats_path (str): CSV file to append stats to, None for no stats
+            stats_every (int): generations between stats rows
+        """
+        super().__init__()
+        self._fps = fps
+        self._stats_path = stats_path
+        self._stats_every = stats_every
+        self._stats = None
+        self._done = None
+
+    async def run(self):
+        """Run the game until the window is closed or one of its tasks fails.  Each part of the loop is its
+        own task and pygame is shut down once they have all stopped.  An exception from a task is raised
+        again here, the same way it would come out of Game.loop."""
+
+        self._done = asyncio.Event()
+        tasks = [asyncio.create_task(self._poll_input()),
+                 asyncio.create_task(self._simulate()),
+                 asyncio.create_task(self._render())]
+        exporter = None
+        if self._stats_path is not None:
+            self._stats = asyncio.Queue()
+            exporter = asyncio.create_task(self._export_stats())
+        closed = asyncio.create_task(self._done.wait())
+        try:
+            await asyncio.wait([closed, *tasks] + ([exporter] if exporter is not None else []),
+                               return_when=asyncio.FIRST_COMPLETED)
+            for task in [closed, *tasks]:
+                task.cancel()
+            await asyncio.gather(closed, *tasks, return_exceptions=True)
+            if exporter is not None:
+                # Nothing queues rows any more, so the exporter writes the ones made right before
+                # closing, in order, and then stops at the None
+                if not exporter.done():
+                    self._stats.put_nowait(None)
+                await asyncio.gather(exporter, return_exceptions=True)
+                tasks.append(exporter)
+            for task in tasks:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in [closed, *tasks]:
+                task.cancel()
+            self.__close_board__()
+            pygame.quit()
+
+    async def _poll_input(self):
+        """Hand pygame events to Game.handle_event about twice a frame."""
+
+        while not self._finished:
+            for event in pygame.event.get():
+                self.handle_event(event)
+            await asyncio.sleep(0.5 / self._fps)
+        self._done.set()
+
+    async def _simulate(self):
+        """Make a generation, then sleep for the speed slider's delay.  Sleeping here only pauses this
+        task, so the window keeps drawing and taking input."""
+
+        while True:
+            if self._running:
+                self.step()
+                if self._stats is not None and self._generations % self._stats_every == 0:
+                    cells = self._board.get_cells()
+                    population = sum(1 for row in cells for color in row if color)
+                    self._stats.put_nowait([self._generations, population, time.time()])
+                await asyncio.sleep(self._delay / 1000)
+            else:
+                await asyncio.sleep(1 / self._fps)
+
+    async def _render(self):
+        """Update the GUI manager and redraw at a steady frame rate."""
+
+        loop = asyncio.get_running_loop()
+        last = loop.time()
+        while True:
+            now = loop.time()
+            self._manager.update(now - last)
+            last = now
+            self.draw()
+            # Sleep for what is left of this frame
+            await asyncio.sleep(max(0.0, 1 / self._fps - (loop.time() - now)))
+
+    async def _export_stats(self):
+        """Append the generation, population and time rows queued by _simulate to the CSV file, until a
+        None is queued.  The file write happens in a worker thread so it never holds up a frame, and only
+        one row is written at a time so rows stay in order."""
+
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await self._stats.get()
+            if row is None:
+                return
+            await loop.run_in_executor(None, self._write_row, row)
+
+    def _write_row(self, row: list):
+        """Append a row to the stats file, writing the header if the file is new."""
+
+        with open(self._stats_path, 'a', newline='') as file:
+            writer = csv.writer(file)
+            if file.tell() == 0:
+                writer.writerow(['generation', 'population', 'time'])
+            writer.writerow(row)
+
+
+def main():
+    asyncio.run(AsyncGame(stats_path='life_stats.csv').run())
+
+
+if __name__ == '__main__':
+    main()
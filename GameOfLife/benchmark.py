@@ -0,0 +1,152 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# Times Board.update for the bounded and wrapped boundary modes against
+# the original neighbor counting (try/except IndexError and -1 checks).
+# Run with: python benchmark.py
+
+import copy
+import random
+import timeit
+
+from board import Board
+
+
+class LegacyBoard(Board):
+    """
+    Board that counts neighbors the way the original Board did, by catching
+    IndexError at the edges and checking for -1 so indexes don't wrap.  Only
+    used as a point of comparison, so it also keeps the original float
+    (r, g, b) tuple colors.
+    """
+    def __init__(self, size) -> None:
+        """
+        Creates a bounded board of (0, 0, 0) tuples
+
+        Parameters:
+            size (int): the size of the board to be created (size x size)
+        """
+        super().__init__(size)
+        self._board = [[(0, 0, 0) for i in range(size)] for j in range(size)]
+
+    def get_board(self) -> list:
+        """
+        Getter for the board attribute
+
+        Returns:
+            _board (list): list of lists of (r, g, b) tuples
+        """
+        return self._board
+
+    def change_color(self, i: int, j: int) -> None:
+        """
+        Original change_color, sets a cell to a random (r, g, b) tuple
+
+        Parameters:
+            i (int): represents a passed in index
+            j (int): represents a passed in index
+        """
+        self._board[i][j] = (random.randint(0, 255), random.randint(0, 255),
+                             random.randint(0, 255))
+
+    def count_neighbors(self, i: int, j: int) -> tuple[int, tuple[int, int, int]]:
+        """
+        Original neighbor count, see Board.count_neighbors
+
+        Parameters:
+            i (int): represents a passed in index
+            j (int): represents a passed in index
+
+        Returns:
+            num_neighbors (int): Number of active neighbor cell's
+            avg_color (tuple): Holds the average color of the neighbor cells
+        """
+        num_neighbors = 0
+        color_list = []
+        for x in range(-1, 2):
+            for y in range(-1, 2):
+                if x == 0 and y == 0:
+                    pass
+                else:
+                    try:
+                        if self._prior[i + x][j + y] != (0, 0, 0) and\
+                                (i + x != -1 and j + y != -1):
+                            num_neighbors += 1
+                            color_list.append(self._prior[i + x][j + y])
+                    except IndexError:
+                        pass
+        if num_neighbors > 0:
+            r_total = sum(color[0] for color in color_list)
+            g_total = sum(color[1] for color in color_list)
+            b_total = sum(color[2] for color in color_list)
+            avg_color = (r_total / len(color_list), g_total / len(color_list),
+                         b_total / len(color_list))
+        else:
+            avg_color = (0, 0, 0)
+        return num_neighbors, avg_color
+
+    def update(self) -> None:
+        """
+        Original update, copies the board with deepcopy before counting
+        """
+        self._prior = copy.deepcopy(self._board)
+        for i in range(self.size):
+            for j in range(self.size):
+                num_neighbors, avg_color = self.count_neighbors(i, j)
+                if num_neighbors < 2 or num_neighbors > 3:
+                    self._board[i][j] = (0, 0, 0)
+                elif num_neighbors == 3:
+                    self._board[i][j] = avg_color
+        if random.randint(1, 100) == 42:
+            self.change_color(random.randint(0, self.size - 1),
+                              random.randint(0, self.size - 1))
+
+
+def seeded_board(board: Board, density: int, seed: int) -> Board:
+    """
+    Fills a board with random cells the same way Game.randomize does
+
+    Parameters:
+        board (Board): empty board to fill
+        density (int): percent chance (1-100) that a cell starts alive
+        seed (int): seed for the random module so runs are repeatable
+
+    Returns:
+        board (Board): the filled in board
+    """
+    random.seed(seed)
+    for i in range(board.size):
+        for j in range(board.size):
+            if random.randint(1, 100) <= density:
+                board.change_color(i, j)
+    return board
+
+
+def time_update(board: Board, generations: int) -> float:
+    """
+    Times how long one generation takes on average
+
+    Parameters:
+        board (Board): board to update
+        generations (int): how many generations to average over
+
+    Returns:
+        (float): milliseconds per generation
+    """
+    return timeit.timeit(board.update, number=generations) / generations * 1000
+
+
+def main():
+    print('Board kernel: ' + Board(1).kernel)
+    print(f"{'size':>6} {'legacy ms':>10} {'bounded ms':>11} {'wrapped ms':>11} {'speedup':>8}")
+    for size in (10, 20, 50, 100):
+        generations = max(5, 2000 // size)
+        legacy = time_update(seeded_board(LegacyBoard(size), 20, 163), generations)
+        bounded = time_update(seeded_board(Board(size), 20, 163), generations)
+        wrapped = time_update(seeded_board(Board(size, True), 20, 163), generations)
+        print(f"{size:>6} {legacy:>10.2f} {bounded:>11.2f} {wrapped:>11.2f} {legacy / bounded:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+# Name: Clay Beal
+# Date: 1/22/23
+# Class: CIS 163
+# Professor: Woodring
+
+import functools
+import random
+
+import kernels
+
+
+def pack_color(r: int, g: int, b: int) -> int:
+    """
+    Packs an (r, g, b) color into a single 24-bit integer 0xRRGGBB
+
+    Parameters:
+        r (int): red value from 0-255
+        g (int): green value from 0-255
+        b (int): blue value from 0-255
+
+    Returns:
+        (int): the packed color, 0 being a dead cell
+    """
+    return (r << 16) | (g << 8) | b
+
+
+def unpack_color(color: int) -> tuple[int, int, int]:
+    """
+    Turns a packed 24-bit color back into an (r, g, b) tuple
+
+    Parameters:
+        color (int): packed color 0xRRGGBB
+
+    Returns:
+        (tuple): (r, g, b) tuple for pygame to draw with
+    """
+    return color >> 16, (color >> 8) & 0xFF, color & 0xFF
+
+
+@functools.lru_cache(maxsize=None)
+def neighbor_table(size: int, wrap: bool) -> tuple:
+    """
+    Works out, once per board size and boundary mode, the flat index of
+    every neighbor of every cell.  Bounded boards leave out the neighbors
+    that fall off the edge and wrapped boards take them from the opposite
+    edge instead
+
+    Parameters:
+        size (int): size of the board (size x size)
+        wrap (bool): True for wrapped edges
+
+    Returns:
+        (tuple): for each flat index i * size + j, a tuple of the flat
+                 indexes of its neighbors
+    """
+    table = []
+    for i in range(size):
+        for j in range(size):
+            cell = []
+            # Same order the neighbors have always been visited in
+            for x in range(-1, 2):
+                for y in range(-1, 2):
+                    if x == 0 and y == 0:
+                        continue
+                    if wrap:
+                        cell.append((i + x) % size * size + (j + y) % size)
+                    elif 0 <= i + x < size and 0 <= j + y < size:
+                        cell.append((i + x) * size + j + y)
+            table.append(tuple(cell))
+    return tuple(table)
+
+
+class Board:
+    """
+    The board class is a blueprint for a board which may consist of different
+    sizes and holds a packed 24-bit color 0xRRGGBB (0 default, meaning dead)
+    for each individual cell in the size x size board
+
+    Attributes:
+        size (int): the size of the board to be created (size x size)
+        wrap (bool): False for dead (bounded) edges, True for a toroidal
+                     world where the edges wrap around to the other side
+        _board (list): flat list of size * size packed colors, 0 default.
+                       Cell (i, j) is at index i * size + j
+        _prior (list): Same as _board, holds a copy of the _board for
+                       modifications to take place more easily
+        _neighbors (tuple): neighbor_table for the board's size and
+                            boundary mode, shared by every board like it
+        kernel (str): name of the kernel (see kernels.py) that steps the
+                      board
+    """
+    def __init__(self, size, wrap=False, kernel=None) -> None:
+        """
+        Creates a new board and initializes size, creates the default
+        board layout and places a copy of the board into _prior
+
+        Parameters:
+            size (int): the size of the board to be created (size x size)
+            wrap (bool): True to make the edges of the board wrap around
+            kernel (str): kernel to step the board with, the best one
+                          available if None
+        """
+        self.size = size
+        self.wrap = wrap
+        self.kernel = kernel if kernel is not None else kernels.default_kernel()
+        # Looks the kernel up now so a bad name fails right away
+        self._step = kernels.get_kernel(self.kernel)
+        # Makes a flat board of size x size 0's
+        self._board = [0] * (size * size)
+        # Makes a copy of the board used for updating the board
+        self._prior = self._board[:]
+        # Every cell's neighbors are worked out once per size, so updates
+        # never have to check the edges of the board
+        self._neighbors = neighbor_table(size, wrap)
+
+    def set_wrap(self, wrap: bool) -> None:
+        """
+        Switches the boundary mode of the board, keeping its cells
+
+        Parameters:
+            wrap (bool): True for wrapped edges, False for dead edges
+        """
+        self.wrap = wrap
+        self._neighbors = neighbor_table(self.size, wrap)
+
+    def get_board(self) -> list:
+        """
+        Tuple view of the board for the renderer
+
+        Returns:
+            (list): list of lists of (r, g, b) tuples containing the colors
+                    for the respective board cells
+
+        """
+        return [[unpack_color(color) for color in row] for row in self.get_cells()]
+
+    def get_cells(self) -> list:
+        """
+        Rows of the board.  This is a copy, use set_cell to change a cell
+
+        Returns:
+            (list): list of lists of packed colors for the respective board
+                    cells, 0 for dead cells
+        """
+        size = self.size
+        return [self._board[i * size:(i + 1) * size] for i in range(size)]
+
+    def get_cell(self, i: int, j: int) -> int:
+        """
+        Gets the color of one cell
+
+        Parameters:
+            i (int): represents a passed in index
+            j (int): represents a passed in index
+
+        Returns:
+            (int): packed color of the cell, 0 if it is dead
+        """
+        return self._board[i * self.size + j]
+
+    def set_cell(self, i: int, j: int, color: int) -> None:
+        """
+        Sets the color of one cell
+
+        Parameters:
+            i (int): represents a passed in index
+            j (int): represents a passed in index
+            color (int): packed color, 0 to kill the cell
+        """
+        self._board[i * self.size + j] = color
+
+    def change_color(self, i: int, j: int) -> None:
+        """
+        This function uses three variables (r, g, b) to compute a random
+        color and assigns it to a passed in index on the board
+
+        Parameters:
+            i (int): represents a passed in index
+            j (int): represents a passed in index
+
+        Variables:
+            r_val (int): random integer from 0-255 to represent a color value
+            g_val (int): random integer from 0-255 to represent a color value
+            b_val (int): random integer from 0-255 to represent a color value
+        """
+        # Gets a random integer from 0 - 255
+        r_val = random.randint(0, 255)
+        g_val = random.randint(0, 255)
+        b_val = random.randint(0, 255)
+        # Sets a specific passed index to the three random integers packed
+        # into one color
+        self._board[i * self.size + j] = pack_color(r_val, g_val, b_val)
+
+    def stamp(self, cells: list, i: int, j: int, color: int = None) -> None:
+        """
+        Sets a whole group of cells alive at once, for placing patterns.
+        Cells that fall off a bounded board are left out and cells that
+        fall off a wrapped board come back on the other side
+
+        Parameters:
+            cells (list): (di, dj) offsets of the live cells
+            i (int): index the offsets are measured from
+            j (int): index the offsets are measured from
+            color (int): packed color for the cells, a random one if None
+        """
+        if color is None:
+            color = pack_color(random.randint(0, 255), random.randint(0, 255),
+                               random.randint(0, 255))
+        size = self.size
+        board = self._board
+        if self.wrap:
+            for di, dj in cells:
+                board[(i + di) % size * size + (j + dj) % size] = color
+        else:
+            for di, dj in cells:
+                if 0 <= i + di < size and 0 <= j + dj < size:
+                    board[(i + di) * size + j + dj] = color
+
+    def count_neighbors(self, i: int, j: int) -> tuple[int, int]:
+        """
+        Counts the number of neighbors a specific cell has, as well as
+        computes the average color of the neighbors if at least one is
+        present.  Each channel is averaged with integer division (rounded up)
+        so colors stay packed integers.
+
+        Parameters:
+            i (int): represents a passed in index
+            j (int): represents a passed in index
+
+        Variables:
+            num_neighbors (int): Holds the number of neighbors a specific cell
+                                 has.
+            r_total (int): Used to get the total of all the r values of the
+                           active neighbors
+            g_total (int): Used to get the total of all the g values of the
+                           active neighbors
+            b_total (int): Used to get the total of all the b values of the
+                           active neighbors
+            avg_color (int): Holds the packed average color of the alive
+                             cells
+
+        Returns:
+            num_neighbors (int): Number of active neighbor cell's
+            avg_color (int): Holds the packed average color of the neighbors
+        """
+        # Holds number of neighbors
+        num_neighbors = 0
+        # Holds the totals of the red, green and blue parts of the colors
+        r_total = 0
+        g_total = 0
+        b_total = 0
+        prior = self._prior
+
+        # The neighbor table already only holds cells that exist (or that
+        # wrapped around), so every entry can be looked at directly
+        for index in self._neighbors[i * self.size + j]:
+            color = prior[index]
+            # Checks to see if the neighbor is active on the prior board,
+            # as we only update the actual one
+            if color:
+                num_neighbors += 1
+                r_total += color >> 16
+                g_total += (color >> 8) & 0xFF
+                b_total += color & 0xFF
+        # If the number of neighbors is greater than 0 divide each total by
+        # the number of neighbors and pack it back together.  The division
+        # rounds up so the average of live colors is never the dead color 0
+        if num_neighbors > 0:
+            avg_color = pack_color(-(-r_total // num_neighbors),
+                                   -(-g_total // num_neighbors),
+                                   -(-b_total // num_neighbors))
+        # If there are no neighbors set average color to 0
+        else:
+            avg_color = 0
+        # Return the number of neighbors and the packed average color
+        return num_neighbors, avg_color
+
+    def update(self) -> None:
+        """
+        Looks at the board from the previous generation and updates the board
+        depending on the number of neighbors a cell has and color of it's neighbors
+        Also gives a chance for a mutation to occur 1% of the time
+        """
+        self.step()
+        # Sets a variable as a random integer from 0 to 100
+        mutation = random.randint(1, 100)
+        # Checks to see if that integer is equal to 42
+        if mutation == 42:
+            # Sets a random cell on the board equal to a random color
+            self.change_color(random.randint(0, self.size - 1),
+                              random.randint(0, self.size - 1))
+
+    def set_kernel(self, kernel: str) -> None:
+        """
+        Switches the kernel that steps the board
+
+        Parameters:
+            kernel (str): name of a registered kernel
+        """
+        self._step = kernels.get_kernel(kernel)
+        self.kernel = kernel
+
+    def step(self) -> None:
+        """
+        Applies the rules of life to every cell for one generation, without
+        the random mutation that update adds
+        """
+        self._step(self)
+
+    def reference_step(self) -> None:
+        """
+        The reference kernel: steps the board one cell at a time with
+        count_neighbors.  Every other kernel has to match it exactly
+        """
+        # Makes a new copy of the actual board into prior
+        self._prior = self._board[:]
+        # Loops through the length and width of the board
+        # (i and j being indexes to pass to count_neighbors)
+        for i in range(self.size):
+            for j in range(self.size):
+                # Gets the neighbors and average color of the neighbors
+                num_neighbors, avg_color = self.count_neighbors(i, j)
+                # Checks to see if a specific cell has less than two or more
+                # than three neighbors
+                if num_neighbors < 2 or num_neighbors > 3:
+                    # Makes specific index on the board "dead" (0)
+                    self._board[i * self.size + j] = 0
+                # Checks to see if the number of neighbors is exactly three
+                elif num_neighbors == 3:
+                    # Makes that index the average color of the
+                    # surrounding neighbors
+                    self._board[i * self.size + j] = avg_color
@@ -4,11 +4,14 @@
 # Class: CIS 163
 # Professor: Woodring
 
-import copy
 import pygame
 import pygame_gui
 import random
 
+from board import Board
+from infinite import InfiniteBoard
+from pattern_library import PatternLibrary
+
 # Constant for board size.  GUI is optimized for 20.
 SIZE = 20
 
@@ -20,8 +23,11 @@ class Game:
     """
 
     def __init__(self):
+        # Track if the world's edges are dead, wrap around (toroidal) or if
+        # the world has no edges at all
+        self._edges = 'Bounded'
         # A Board is the cells' world
-        self._board = Board(SIZE)
+        self._board = self.__make_board__()
         # We will represent a cell with a rectangle from the pygame library.  This function
         # creates them.
         self._rects = self.__make_rects__()
@@ -57,6 +63,25 @@ class Game:
                                                                     start_value=250,
                                                                     value_range=(0, 1000),
                                                                     manager=self._manager)
+        # Create a button to switch between dead, wrapped and no edges
+        self._edges_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((700, 525), (250, 50)),
+                                                          text='Edges: Bounded',
+                                                          manager=self._manager)
+        # Patterns that can be placed with a right click
+        self._patterns = PatternLibrary()
+        pattern_names = self._patterns.names()
+        self._pattern = pattern_names[0] if pattern_names else None
+        # Create a drop down to pick the pattern to place
+        self._pattern_menu = pygame_gui.elements.UIDropDownMenu(options_list=pattern_names or ['No patterns'],
+                                                                starting_option=self._pattern or 'No patterns',
+                                                                relative_rect=pygame.Rect((700, 600), (250, 50)),
+                                                                manager=self._manager)
+        # Create a button to turn the pattern a quarter turn
+        self._rotate_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((700, 675), (250, 50)),
+                                                           text='Rotation: 0',
+                                                           manager=self._manager)
+        # Quarter turns clockwise to place the pattern with
+        self._turns = 0
         # Track if the simulation is running or not
         self._running = False
         # Track if the application should be finished and close
@@ -79,73 +104,105 @@ class Game:
         while not self._finished:
             # Ensure 60 frames per second
             time_delta = clock.tick(60)/1000.0
-            # Ask pygame for events
+            # Ask pygame for events and handle each one
             for event in pygame.event.get():
-                # If window close event happens, set _finished to True
-                if event.type == pygame.QUIT:
-                    self._finished = True
-                # Left mouse click events
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    # Find coordinate of click
-                    coords = pygame.mouse.get_pos()
-                    # See if that coordinate is in a cell.  If it is, this function returns which one.
-                    i, j, rectangle = self.__select_rectangle__(coords)
-                    # If function returned None it means we didn't click a cell
-                    if rectangle is not None:
-                        # We clicked a cell.  Change its color.
-                        self._board.change_color(i, j)
-                # Did the user click a button?  If so, figure out which and call the
-                # appropriate function.
-                if event.type == pygame_gui.UI_BUTTON_PRESSED:
-                    if event.ui_element == self._play_button:
-                        self.toggle()
-                    if event.ui_element == self._reset_button:
-                        self.reset()
-                    if event.ui_element == self._random_button:
-                        self.randomize()
-                # Speed slider moved.  Update the label.
-                if event.type == pygame_gui.UI_HORIZONTAL_SLIDER_MOVED:
-                    self._speed_label.set_text("Speed: " + str(self._speed_slider.get_current_value()) + "ms")
-                    self._delay = int(self._speed_slider.get_current_value())
-                # Have the GUI manager handle GUI events
-                self._manager.process_events(event)
+                self.handle_event(event)
 
             # Let the GUI manager know the time change since last frame
             self._manager.update(time_delta)
             # If we aren't paused, calculate the next generation
             if self._running:
-                # Cell updates happen in the Board class.  Call it.
-                self._board.update()
-                # Increment generations.
-                self._generations = self._generations + 1
-                # Update generations label
-                self._generations_label.set_text("Generations: " + str(self._generations))
+                self.step()
                 # Wait to delay.  Not the best method, but eh.
                 pygame.time.wait(self._delay)
 
-            # Fill the screen with white
-            self._screen.fill((255, 255, 255))
-            # Redraw the world
-            self.__draw_board__()
-            # Redraw the GUI elements
-            self._manager.draw_ui(self._screen)
-            # Flip buffers
-            pygame.display.update()
+            # Redraw the world and the GUI
+            self.draw()
 
-        # Loop is over (user clicked quit).  Shutdown pygame.
+        # Loop is over (user clicked quit).  Remove any chunk files and shutdown pygame.
+        self.__close_board__()
         pygame.quit()
 
+    def handle_event(self, event):
+        """Handle one pygame event: quitting, clicks on cells, GUI buttons, the drop down and the
+        speed slider."""
+
+        # If window close event happens, set _finished to True
+        if event.type == pygame.QUIT:
+            self._finished = True
+        # Left mouse click events
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            # Find coordinate of click
+            coords = pygame.mouse.get_pos()
+            # See if that coordinate is in a cell.  If it is, this function returns which one.
+            i, j, rectangle = self.__select_rectangle__(coords)
+            # If function returned None it means we didn't click a cell
+            if rectangle is not None:
+                # We clicked a cell.  Change its color.
+                self._board.change_color(i, j)
+        # Right mouse click events place the chosen pattern
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 3 and self._pattern:
+            i, j, rectangle = self.__select_rectangle__(pygame.mouse.get_pos())
+            if rectangle is not None:
+                self._patterns.get(self._pattern).stamp(self._board, i, j, self._turns)
+        # Did the user click a button?  If so, figure out which and call the
+        # appropriate function.
+        if event.type == pygame_gui.UI_BUTTON_PRESSED:
+            if event.ui_element == self._play_button:
+                self.toggle()
+            if event.ui_element == self._reset_button:
+                self.reset()
+            if event.ui_element == self._random_button:
+                self.randomize()
+            if event.ui_element == self._edges_button:
+                self.toggle_edges()
+            if event.ui_element == self._rotate_button:
+                self._turns = (self._turns + 1) % 4
+                self._rotate_button.set_text("Rotation: " + str(self._turns * 90))
+        # A new pattern was picked from the drop down
+        if event.type == pygame_gui.UI_DROP_DOWN_MENU_CHANGED and event.ui_element == self._pattern_menu:
+            if self._pattern is not None:
+                self._pattern = event.text
+        # Speed slider moved.  Update the label.
+        if event.type == pygame_gui.UI_HORIZONTAL_SLIDER_MOVED:
+            self._speed_label.set_text("Speed: " + str(self._speed_slider.get_current_value()) + "ms")
+            self._delay = int(self._speed_slider.get_current_value())
+        # Have the GUI manager handle GUI events
+        self._manager.process_events(event)
+
+    def step(self):
+        """Calculate the next generation and update the generations label."""
+
+        # Cell updates happen in the Board class.  Call it.
+        self._board.update()
+        # Increment generations.
+        self._generations = self._generations + 1
+        # Update generations label
+        self._generations_label.set_text("Generations: " + str(self._generations))
+
+    def draw(self):
+        """Redraw the world and the GUI and flip the buffers."""
+
+        # Fill the screen with white
+        self._screen.fill((255, 255, 255))
+        # Redraw the world
+        self.__draw_board__()
+        # Redraw the GUI elements
+        self._manager.draw_ui(self._screen)
+        # Flip buffers
+        pygame.display.update()
+
     def reset(self):
         """Set the simulation back to its starting point values (blank world, zero generations)."""
 
-        self._board = Board(SIZE)
+        self.__replace_board__()
         self._generations = 0
 
     def randomize(self):
         """Create a random world.  Would be neat to expand it to accept values for density of cells,
         but I didn't want to today.  Fill level at about 20% works pretty well."""
 
-        self._board = Board(SIZE)
+        self.__replace_board__()
         for i in range(SIZE):
             for j in range (SIZE):
                 if random.randint(1, 100) <= 20:
@@ -160,6 +217,46 @@ class Game:
         else:
             self._play_button.set_text("Paused")
 
+    def toggle_edges(self):
+        """Switch the world from dead edges, to edges that wrap around, to an infinite world
+        (where the screen shows the cells around the origin) and back.  Visible cells are kept."""
+
+        modes = ['Bounded', 'Wrapped', 'Infinite']
+        self._edges = modes[(modes.index(self._edges) + 1) % len(modes)]
+        self._edges_button.set_text("Edges: " + self._edges)
+        if self._edges == 'Wrapped':
+            self._board.set_wrap(True)
+            return
+        # Moving to or from the infinite world needs a new kind of board
+        cells = self._board.get_cells()
+        self.__replace_board__()
+        for i in range(SIZE):
+            for j in range(SIZE):
+                if cells[i][j]:
+                    if isinstance(self._board, InfiniteBoard):
+                        self._board.set(i, j, cells[i][j])
+                    else:
+                        self._board.set_cell(i, j, cells[i][j])
+
+    def __make_board__(self):
+        """Make and return an empty world for the current edge mode."""
+
+        if self._edges == 'Infinite':
+            return InfiniteBoard(SIZE)
+        return Board(SIZE, self._edges == 'Wrapped')
+
+    def __replace_board__(self):
+        """Swap the world for an empty one for the current edge mode, closing the old one first."""
+
+        self.__close_board__()
+        self._board = self.__make_board__()
+
+    def __close_board__(self):
+        """Close an infinite world so its chunk files and temporary directory don't stay on disk."""
+
+        if isinstance(self._board, InfiniteBoard):
+            self._board.close()
+
     def __select_rectangle__(self, coords: [int, int]) -> (int, int, pygame.Rect):
         """Given a set of coordinates, determine if they lie in one of our rectangles
         that represent our cells.  If so, return coordinates and the rectangle.  Otherwise
@@ -189,186 +286,3 @@ class Game:
         for i in range(SIZE):
             for j in range(SIZE):
                 pygame.draw.rect(self._screen, board[i][j], self._rects[i][j])
-
-
-# Write your code to complete the project below this line.
-
-# Name: Clay Beal
-# Date: 1/22/23
-# Class: CIS 163
-# Professor: Woodring
-
-
-class Board:
-    """
-    The board class is a blueprint for a board which may consist of different
-    sizes and creates a tuple (0,0,0) default to hold a color value for each
-    individual cell in the size x size board
-
-    Attributes:
-        size (int): the size of the board to be created (size x size)
-        _board (list): This is a list of lists of tuples (0,0,0) default
-                       The number of tuples per list depends on size
-        _prior (list): Same as _board, holds a copy of the _board for
-                       modifications to take place more easily
-    """
-    def __init__(self, size) -> None:
-        """
-        Creates a new board and initializes size, creates the default
-        board layout and places a copy of the board into _prior
-
-        Parameters:
-            size (int): the size of the board to be created (size x size)
-        """
-        self.size = size
-        # Makes a board using nested lists of (0, 0, 0) (size x size)
-        self._board = [[(0, 0, 0) for i in range(size)] for j in range(size)]
-        # Makes a copy of the board used for updating the board
-        self._prior = copy.deepcopy(self._board)
-
-    def get_board(self) -> list:
-        """
-        Getter for the board attribute
-
-        Returns:
-            _board (list): list of lists of tuples containing the colors
-                           for the respective board cells
-
-        """
-        return self._board
-
-    def change_color(self, i: int, j: int) -> None:
-        """
-        This function uses three variables (r, g, b) to compute a random
-        color and assigns it to a passed in index on the board
-
-        Parameters:
-            i (int): represents a passed in index
-            j (int): represents a passed in index
-
-        Variables:
-            r_val (int): random integer from 0-255 to represent a color value
-            g_val (int): random integer from 0-255 to represent a color value
-            b_val (int): random integer from 0-255 to represent a color value
-        """
-        # Gets a random integer from 0 - 255
-        r_val = random.randint(0, 255)
-        g_val = random.randint(0, 255)
-        b_val = random.randint(0, 255)
-        # Sets a specific passed index to a tuple of three random integers
-        self._board[i][j] = (r_val, g_val, b_val)
-
-    def count_neighbors(self, i: int, j: int) -> tuple[int, tuple[int, int, int]]:
-        """
-        Counts the number of neighbors a specific cell has, as well as
-        computes the average color of the neighbors if at least one is
-        present.
-
-        Parameters:
-            i (int): represents a passed in index
-            j (int): represents a passed in index
-
-        Variables:
-            num_neighbors (int): Holds the number of neighbors a specific cell
-                                 has.
-            color_list (list): Holds a list of the tuples of active neighbors
-                               Ex. [(5,100,150), (20,230,200)]
-            r_total (int): Used to get the total of all the r values in the
-                           active tuples Ex. (r, g, b)
-            g_total (int): Used to get the total of all the g values in the
-                           active tuples Ex. (r, g, b)
-            b_total (int): Used to get the total of all the b values in the
-                           active tuples Ex. (r, g, b)
-            avg_color (tuple): Holds the value for the average color of the
-                               alive cells
-
-        Returns:
-            num_neighbors (int): Number of active neighbor cell's
-            avg_color (tuple): Holds the average color of the neighbor cells
-        """
-        # Holds number of neighbors
-        num_neighbors = 0
-        # Holds a list of tuples, each one being of an active neighbor cell
-        color_list = []
-        # Holds the totals of the first, second, and third index of the tuples
-        r_total = 0
-        g_total = 0
-        b_total = 0
-
-        # This algorithm checks to see if the neighboring cells of one at
-        # the passed in index hold a tuple that's NOT (0, 0, 0), meaning
-        # that they are active. If it is active it saves that specific
-        # tuple in a list and increments the active neighbor count
-        # Checks a range from -1 to 1
-        for x in range(-1, 2):
-            # Checks a range from -1 to 1
-            for y in range(-1, 2):
-                # Passes if x and y are 0, because that would mean we are
-                # checking the passed in index instead of it's neighbors
-                if x == 0 and y == 0:
-                    pass
-                else:
-                    try:
-                        # Checks to see if the indexes neighbors are active
-                        # on the prior board, as we only update the actual one
-                        # Also makes sure the index isn't checking -1 to ensure
-                        # the index doesn't wrap from index [0] to [-1]
-                        if self._prior[i + x][j + y] != (0, 0, 0) and\
-                                (i + x != -1 and j + y != -1):
-                            # Increment neighbor count
-                            num_neighbors += 1
-                            # Add the active neighbor tuple to the color list
-                            color_list.append(self._prior[i + x][j + y])
-                    # If there is an index error continue with the other
-                    # neighbor checks, must mean the neighbor doesn't exist
-                    except IndexError:
-                        pass
-        # If the number of neighbors is greater than 0
-        if num_neighbors > 0:
-            # Get the total of the (r, g, b) values respectively
-            for color_tuple in color_list:
-                r_total += color_tuple[0]
-                g_total += color_tuple[1]
-                b_total += color_tuple[2]
-            # Dives each one of those values by the length of the color list
-            # and put it in a tuple
-            avg_color = (r_total / len(color_list), g_total / len(color_list),
-                         b_total / len(color_list))
-        # If there are no neighbors set average color to (0, 0, 0)
-        else:
-            avg_color = (0, 0, 0)
-        # Return the number of neighbors and the average color tuple
-        return num_neighbors, avg_color
-
-    def update(self) -> None:
-        """
-        Looks at the board from the previous generation and updates the board
-        depending on the number of neighbors a cell has and color of it's neighbors
-        Also gives a chance for a mutation to occur 1% of the time
-        """
-        # Makes a new copy of the actual board into prior
-        self._prior = copy.deepcopy(self._board)
-        # Loops through the length and width of the board
-        # (i and j being indexes to pass to count_neighbors)
-        for i in range(len(self._prior)):
-            for j in range(len(self._prior)):
-                # Gets the neighbors and average color of the neighbors
-                num_neighbors, avg_color = self.count_neighbors(i, j)
-                # Checks to see if a specific cell has less than two or more
-                # than three neighbors
-                if num_neighbors < 2 or num_neighbors > 3:
-                    # Makes specific index on the board "dead" (0, 0, 0)
-                    self._board[i][j] = (0, 0, 0)
-                # Checks to see if the number of neighbors is exactly three
-                elif num_neighbors == 3:
-                    # Makes that index the average color of the
-                    # surrounding neighbors
-                    self._board[i][j] = avg_color
-                else:
-                    pass
-        # Sets a variable as a random integer from 0 to 100
-        mutation = random.randint(1, 100)
-        # Checks to see if that integer is equal to 42
-        if mutation == 42:
-            # Sets a random cell on the board equal to a random color
-            self.change_color(random.randint(0, 19), random.randint(0, 19))
@@ -0,0 +1,304 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# Differential checking and benchmarking for Life engines.  An engine is
+# anything that is made with (size, wrap) and has change_color(i, j),
+# update() and get_cells(), like Board.  Every engine is run from the same
+# seeds as the reference Board, reseeding the random module before each
+# generation so the mutations match too, and the first cell that differs
+# is reported.
+#
+#     python harness.py check --engines mymodule:FastBoard
+#     python harness.py bench --out bench.json --baseline old_bench.json
+
+import argparse
+import importlib
+import json
+import platform
+import random
+import sys
+import time
+
+import kernels
+from benchmark import seeded_board
+from board import Board
+
+
+def reference_board(size: int, wrap: bool) -> Board:
+    """
+    Makes a Board that steps with the reference kernel
+
+    Parameters:
+        size (int): size of the board
+        wrap (bool): True for wrapped edges
+
+    Returns:
+        (Board): the board
+    """
+    return Board(size, wrap, 'reference')
+
+
+# Engines known by name; the reference is what every other engine must
+# match.  Every kernel that can run here is an engine too
+ENGINES = {'reference': reference_board}
+for _name in kernels.available_kernels():
+    if _name != 'reference':
+        ENGINES['kernel-' + _name] = \
+            lambda size, wrap, kernel=_name: Board(size, wrap, kernel)
+
+
+def register_engine(name: str, factory) -> None:
+    """
+    Adds an engine the harness can check and benchmark by name
+
+    Parameters:
+        name (str): name to refer to the engine by
+        factory (callable): called with (size, wrap) to make a board
+    """
+    ENGINES[name] = factory
+
+
+def load_engine(spec: str):
+    """
+    Finds an engine by registered name or by "module:attribute"
+
+    Parameters:
+        spec (str): engine name or import path
+
+    Returns:
+        (callable): factory called with (size, wrap)
+    """
+    if spec in ENGINES:
+        return ENGINES[spec]
+    if ':' not in spec:
+        raise ValueError('Unknown engine ' + spec + ', use a registered name or module:attribute.')
+    module_name, attribute = spec.split(':', 1)
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def generation_seed(seed: int, generation: int) -> int:
+    """
+    Seed used right before an engine makes a generation
+
+    Parameters:
+        seed (int): seed of the run
+        generation (int): generation about to be made
+
+    Returns:
+        (int): seed for the random module
+    """
+    return seed * 1000003 + generation
+
+
+def first_difference(expected: list, actual: list):
+    """
+    Finds the first cell (row by row) where two boards disagree
+
+    Parameters:
+        expected (list): packed colors from the reference
+        actual (list): packed colors from the engine being checked
+
+    Returns:
+        (tuple): (i, j, expected color, actual color), or None if they match
+    """
+    for i, (expected_row, actual_row) in enumerate(zip(expected, actual)):
+        if expected_row != actual_row:
+            for j, (want, got) in enumerate(zip(expected_row, actual_row)):
+                if want != got:
+                    return i, j, want, got
+            return i, min(len(expected_row), len(actual_row)), None, None
+    if len(expected) != len(actual):
+        return min(len(expected), len(actual)), 0, None, None
+    return None
+
+
+def compare(factory, size: int, density: int, generations: int, seed: int,
+            wrap: bool = False, reference=reference_board):
+    """
+    Runs an engine next to the reference from the same seeds
+
+    Parameters:
+        factory (callable): engine to check, called with (size, wrap)
+        size (int): size of the boards
+        density (int): percent of cells alive at the start
+        generations (int): how many generations to run
+        seed (int): seed for the starting pattern and the mutations
+        wrap (bool): True for wrapped edges
+        reference (callable): engine the other one has to match
+
+    Returns:
+        (dict): where and how they first differ, or None if they never do
+    """
+    expected = reference(size, wrap)
+    actual = factory(size, wrap)
+    seeded_board(expected, density, seed)
+    seeded_board(actual, density, seed)
+    for generation in range(generations + 1):
+        if generation > 0:
+            random.seed(generation_seed(seed, generation))
+            expected.update()
+            random.seed(generation_seed(seed, generation))
+            actual.update()
+        difference = first_difference(expected.get_cells(), actual.get_cells())
+        if difference is not None:
+            i, j, want, got = difference
+            return {'size': size, 'wrap': wrap, 'density': density,
+                    'seed': seed, 'generation': generation, 'cell': [i, j],
+                    'expected': want, 'actual': got}
+    return None
+
+
+def check(factory, sizes=(1, 2, 3, 8, 20, 33), densities=(10, 20, 50),
+          generations: int = 50, seeds: int = 5) -> list:
+    """
+    Compares an engine with the reference over many boards
+
+    Parameters:
+        factory (callable): engine to check, called with (size, wrap)
+        sizes (tuple): board sizes to try
+        densities (tuple): starting densities to try
+        generations (int): generations to run each board for
+        seeds (int): how many seeds to try per combination
+
+    Returns:
+        (list): every difference found, empty if the engine matches
+    """
+    differences = []
+    for wrap in (False, True):
+        for size in sizes:
+            for density in densities:
+                for seed in range(seeds):
+                    difference = compare(factory, size, density, generations,
+                                         seed, wrap)
+                    if difference is not None:
+                        differences.append(difference)
+    return differences
+
+
+def benchmark(engines: dict, sizes=(20, 50, 100), densities=(10, 20, 50),
+              generations=(10, 100), wrap: bool = False, seed: int = 163) -> dict:
+    """
+    Times every engine over a matrix of sizes, densities and run lengths
+
+    Parameters:
+        engines (dict): engine name to factory
+        sizes (tuple): board sizes
+        densities (tuple): starting densities
+        generations (tuple): run lengths
+        wrap (bool): True for wrapped edges
+        seed (int): seed for the starting patterns and mutations
+
+    Returns:
+        (dict): machine details and a list of timings, ready to save as JSON
+    """
+    results = []
+    for name, factory in engines.items():
+        for size in sizes:
+            for density in densities:
+                for count in generations:
+                    board = factory(size, wrap)
+                    seeded_board(board, density, seed)
+                    elapsed = 0.0
+                    for generation in range(1, count + 1):
+                        random.seed(generation_seed(seed, generation))
+                        start = time.perf_counter()
+                        board.update()
+                        elapsed += time.perf_counter() - start
+                    results.append({'engine': name, 'size': size,
+                                    'density': density, 'generations': count,
+                                    'wrap': wrap, 'seconds': elapsed,
+                                    'ms_per_generation': elapsed / count * 1000})
+    return {'python': sys.version.split()[0],
+            'machine': platform.platform(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'results': results}
+
+
+def regressions(baseline: dict, current: dict, tolerance: float = 0.10) -> list:
+    """
+    Finds timings that got slower than a saved baseline
+
+    Parameters:
+        baseline (dict): earlier benchmark results
+        current (dict): new benchmark results
+        tolerance (float): how much slower (0.10 is 10%) is still fine
+
+    Returns:
+        (list): (key, baseline ms, current ms) for each slower timing
+    """
+    def key(result):
+        return (result['engine'], result['size'], result['density'],
+                result['generations'], result.get('wrap', False))
+
+    old = {key(result): result['ms_per_generation'] for result in baseline['results']}
+    slower = []
+    for result in current['results']:
+        before = old.get(key(result))
+        if before is not None and result['ms_per_generation'] > before * (1 + tolerance):
+            slower.append((key(result), before, result['ms_per_generation']))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and benchmark Life engines against Board.')
+    parser.add_argument('command', choices=['check', 'bench'])
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES),
+                        help='registered names or module:attribute')
+    parser.add_argument('--sizes', nargs='+', type=int)
+    parser.add_argument('--densities', nargs='+', type=int)
+    parser.add_argument('--generations', nargs='+', type=int)
+    parser.add_argument('--seeds', type=int, default=5)
+    parser.add_argument('--wrap', action='store_true', help='benchmark with wrapped edges')
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--baseline', help='earlier results to look for regressions against')
+    args = parser.parse_args()
+    engines = {spec: load_engine(spec) for spec in args.engines}
+
+    if args.command == 'check':
+        failed = False
+        for name, factory in engines.items():
+            options = {'seeds': args.seeds}
+            if args.sizes:
+                options['sizes'] = args.sizes
+            if args.densities:
+                options['densities'] = args.densities
+            if args.generations:
+                options['generations'] = args.generations[0]
+            differences = check(factory, **options)
+            if differences:
+                failed = True
+                first = differences[0]
+                print(f"{name}: {len(differences)} runs differ, first at generation "
+                      f"{first['generation']} cell {tuple(first['cell'])} "
+                      f"(size {first['size']}, wrap {first['wrap']}, density {first['density']}, "
+                      f"seed {first['seed']}): expected {first['expected']} got {first['actual']}")
+            else:
+                print(f"{name}: matches the reference")
+        sys.exit(1 if failed else 0)
+
+    options = {'wrap': args.wrap}
+    if args.sizes:
+        options['sizes'] = args.sizes
+    if args.densities:
+        options['densities'] = args.densities
+    if args.generations:
+        options['generations'] = args.generations
+    current = benchmark(engines, **options)
+    for result in current['results']:
+        print(f"{result['engine']:>12} size {result['size']:>4} density {result['density']:>3}% "
+              f"x{result['generations']:>4}: {result['ms_per_generation']:8.3f} ms/generation")
+    with open(args.out, 'w') as file:
+        json.dump(current, file, indent=2)
+    print('Saved to ' + args.out)
+    if args.baseline:
+        with open(args.baseline) as file:
+            slower = regressions(json.load(file), current)
+        for key, before, after in slower:
+            print(f"SLOWER {key}: {before:.3f} -> {after:.3f} ms/generation")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,397 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# An unbounded Life world.  The plane is split into CHUNK_SIZE x CHUNK_SIZE
+# chunks that are stepped with the same rules as Board.  Recently used
+# chunks stay in memory and the rest are written out to a directory, so
+# patterns that travel forever run in constant memory.
+
+import os
+import random
+import tempfile
+from array import array
+from collections import OrderedDict
+
+from board import Board, pack_color, unpack_color
+
+# Width and height of one chunk in cells
+CHUNK_SIZE = 32
+
+
+class ChunkStore:
+    """
+    Holds the chunks of an infinite world.  Chunks are flat lists of packed
+    colors keyed by their (ci, cj) chunk coordinate.  Up to capacity chunks
+    are kept in memory in least recently used order; older ones are written
+    to the directory and read back the next time they are needed.  Empty
+    chunks are never stored, in memory or on disk.
+
+    Attributes:
+        chunk_size (int): width and height of a chunk in cells
+        capacity (int): how many chunks can be in memory at once
+        directory (str): where evicted chunks are written
+        _memory (OrderedDict): chunks in memory, least recently used first
+        _modified (set): keys of chunks in memory that differ from the disk
+        _on_disk (set): keys of chunks that have a file in the directory
+        _tempdir (TemporaryDirectory): directory made when none was given
+    """
+    def __init__(self, directory: str = None, capacity: int = 64,
+                 chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Creates an empty store
+
+        Parameters:
+            directory (str): directory for evicted chunks, a temporary one
+                             is made (and later removed) if this is None
+            capacity (int): how many chunks can be in memory at once
+            chunk_size (int): width and height of a chunk in cells
+        """
+        if capacity < 1:
+            raise ValueError('A chunk store must hold at least one chunk.')
+        self.chunk_size = chunk_size
+        self.capacity = capacity
+        self._tempdir = None
+        if directory is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix='life_chunks_')
+            directory = self._tempdir.name
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._memory = OrderedDict()
+        self._modified = set()
+        self._on_disk = set()
+
+    def _path(self, key: tuple[int, int]) -> str:
+        """
+        Gets the file a chunk is written to
+
+        Parameters:
+            key (tuple): (ci, cj) chunk coordinate
+
+        Returns:
+            (str): path of the chunk's file
+        """
+        return os.path.join(self.directory, f'{key[0]}_{key[1]}.chunk')
+
+    def get(self, key: tuple[int, int]) -> list:
+        """
+        Gets a chunk, reading it back from disk if it was evicted
+
+        Parameters:
+            key (tuple): (ci, cj) chunk coordinate
+
+        Returns:
+            (list): flat list of packed colors, or None for an empty chunk
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if key not in self._on_disk:
+            return None
+        cells = array('I')
+        with open(self._path(key), 'rb') as file:
+            cells.frombytes(file.read())
+        cells = cells.tolist()
+        self._memory[key] = cells
+        self._evict()
+        return cells
+
+    def put(self, key: tuple[int, int], cells: list) -> None:
+        """
+        Stores a chunk, dropping it completely if it has no live cells
+
+        Parameters:
+            key (tuple): (ci, cj) chunk coordinate
+            cells (list): flat list of packed colors
+        """
+        if not any(cells):
+            self._memory.pop(key, None)
+            self._modified.discard(key)
+            if key in self._on_disk:
+                self._on_disk.remove(key)
+                os.remove(self._path(key))
+            return
+        self._memory[key] = cells
+        self._memory.move_to_end(key)
+        self._modified.add(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Writes the least recently used chunks to disk until the memory is
+        back within capacity
+        """
+        while len(self._memory) > self.capacity:
+            key, cells = self._memory.popitem(last=False)
+            # Unchanged chunks already have an up to date file
+            if key in self._modified or key not in self._on_disk:
+                with open(self._path(key), 'wb') as file:
+                    file.write(array('I', cells).tobytes())
+                self._on_disk.add(key)
+            self._modified.discard(key)
+
+    def keys(self) -> set:
+        """
+        Gets every chunk that has live cells
+
+        Returns:
+            (set): (ci, cj) keys in memory or on disk
+        """
+        return set(self._memory) | self._on_disk
+
+    def in_memory(self) -> int:
+        """
+        Returns:
+            (int): how many chunks are currently held in memory
+        """
+        return len(self._memory)
+
+    def close(self) -> None:
+        """
+        Forgets every chunk and removes the temporary directory if the
+        store made one
+        """
+        for key in self._on_disk:
+            os.remove(self._path(key))
+        self._memory.clear()
+        self._modified.clear()
+        self._on_disk.clear()
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+
+class InfiniteBoard:
+    """
+    A Life world with no edges.  Cells are addressed with any (i, j),
+    including negative ones.  Each generation only the chunks that changed
+    last generation and their neighbors are stepped, so still lifes and
+    empty space cost nothing.  There is no random mutation, since there is
+    no fixed area to pick a cell from.
+
+    Attributes:
+        size (int): size of the viewport get_board returns (size x size)
+        origin (tuple): (i, j) cell at the top left of the viewport
+        chunk_size (int): width and height of a chunk in cells
+        _store (ChunkStore): holds the chunks
+        _active (set): chunks that changed and need stepping next update
+        _scratch (Board): bounded board one chunk plus a border wide that
+                          each chunk is stepped on
+    """
+    def __init__(self, size: int = 20, directory: str = None,
+                 capacity: int = 64, chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Creates an empty infinite world
+
+        Parameters:
+            size (int): size of the viewport get_board returns
+            directory (str): where evicted chunks are written, see ChunkStore
+            capacity (int): how many chunks can be in memory at once
+            chunk_size (int): width and height of a chunk in cells
+        """
+        self.size = size
+        self.origin = (0, 0)
+        self.chunk_size = chunk_size
+        self._store = ChunkStore(directory, capacity, chunk_size)
+        self._active = set()
+        self._scratch = Board(chunk_size + 2)
+
+    def get(self, i: int, j: int) -> int:
+        """
+        Gets the packed color of a cell
+
+        Parameters:
+            i (int): row of the cell
+            j (int): column of the cell
+
+        Returns:
+            (int): packed color, 0 if the cell is dead
+        """
+        size = self.chunk_size
+        cells = self._store.get((i // size, j // size))
+        if cells is None:
+            return 0
+        return cells[(i % size) * size + j % size]
+
+    def set(self, i: int, j: int, color: int) -> None:
+        """
+        Sets the packed color of a cell
+
+        Parameters:
+            i (int): row of the cell
+            j (int): column of the cell
+            color (int): packed color, 0 to kill the cell
+        """
+        size = self.chunk_size
+        key = (i // size, j // size)
+        cells = self._store.get(key)
+        if cells is None:
+            if not color:
+                return
+            cells = [0] * (size * size)
+        cells[(i % size) * size + j % size] = color
+        self._store.put(key, cells)
+        self._active.add(key)
+
+    def change_color(self, i: int, j: int) -> None:
+        """
+        Sets a cell relative to the viewport to a random color, like
+        Board.change_color
+
+        Parameters:
+            i (int): row in the viewport
+            j (int): column in the viewport
+        """
+        color = pack_color(random.randint(0, 255), random.randint(0, 255),
+                           random.randint(0, 255))
+        self.set(self.origin[0] + i, self.origin[1] + j, color)
+
+    def stamp(self, cells: list, i: int, j: int, color: int = None) -> None:
+        """
+        Sets a whole group of cells alive at once, relative to the viewport
+        like change_color.  Each chunk touched is fetched and stored once
+
+        Parameters:
+            cells (list): (di, dj) offsets of the live cells
+            i (int): viewport row the offsets are measured from
+            j (int): viewport column the offsets are measured from
+            color (int): packed color for the cells, a random one if None
+        """
+        if color is None:
+            color = pack_color(random.randint(0, 255), random.randint(0, 255),
+                               random.randint(0, 255))
+        size = self.chunk_size
+        i += self.origin[0]
+        j += self.origin[1]
+        # Groups the cells by the chunk they land in
+        by_chunk = {}
+        for di, dj in cells:
+            key = ((i + di) // size, (j + dj) // size)
+            by_chunk.setdefault(key, []).append(
+                ((i + di) % size) * size + (j + dj) % size)
+        for key, indexes in by_chunk.items():
+            chunk = self._store.get(key)
+            if chunk is None:
+                chunk = [0] * (size * size)
+            for index in indexes:
+                chunk[index] = color
+            self._store.put(key, chunk)
+            self._active.add(key)
+
+    def get_board(self) -> list:
+        """
+        Tuple view of the viewport for the renderer
+
+        Returns:
+            (list): size x size list of lists of (r, g, b) tuples
+        """
+        return [[unpack_color(color) for color in row]
+                for row in self.get_cells()]
+
+    def get_cells(self) -> list:
+        """
+        Packed colors of the viewport
+
+        Returns:
+            (list): size x size list of lists of packed colors
+        """
+        top, left = self.origin
+        return [[self.get(top + i, left + j) for j in range(self.size)]
+                for i in range(self.size)]
+
+    def live_cells(self):
+        """
+        Goes over every live cell in the world
+
+        Yields:
+            (tuple): (i, j, color) for each live cell
+        """
+        size = self.chunk_size
+        for key in sorted(self._store.keys()):
+            cells = self._store.get(key)
+            for index, color in enumerate(cells):
+                if color:
+                    yield (key[0] * size + index // size,
+                           key[1] * size + index % size, color)
+
+    def population(self) -> int:
+        """
+        Returns:
+            (int): number of live cells in the world
+        """
+        return sum(1 for _ in self.live_cells())
+
+    def _window(self, key: tuple[int, int]) -> list:
+        """
+        Builds the chunk at key with a one cell border taken from its eight
+        neighbor chunks, as a flat board for the scratch board
+
+        Parameters:
+            key (tuple): (ci, cj) chunk coordinate
+
+        Returns:
+            (list): flat (chunk_size + 2) x (chunk_size + 2) board, or None
+                    when the chunk and its border are all dead
+        """
+        size = self.chunk_size
+        width = size + 2
+        ci, cj = key
+        window = [0] * (width * width)
+        alive = False
+        for di in range(-1, 2):
+            for dj in range(-1, 2):
+                cells = self._store.get((ci + di, cj + dj))
+                if cells is None:
+                    continue
+                alive = True
+                # Which rows and columns of the neighbor fall in the window
+                i_range = range(size) if di == 0 else [size - 1 if di < 0 else 0]
+                j_start = 0 if dj == 0 else (size - 1 if dj < 0 else 0)
+                j_stop = size if dj == 0 else j_start + 1
+                for i in i_range:
+                    start = (i + 1 + di * size) * width + 1 + dj * size
+                    window[start + j_start:start + j_stop] = \
+                        cells[i * size + j_start:i * size + j_stop]
+        if not alive:
+            return None
+        return window
+
+    def update(self) -> None:
+        """
+        Steps every chunk that could change by one generation.  All of the
+        new chunks are worked out from the old ones before any are stored
+        """
+        size = self.chunk_size
+        width = size + 2
+        # Chunks next to a changed chunk can change too
+        to_step = set()
+        for ci, cj in self._active:
+            for di in range(-1, 2):
+                for dj in range(-1, 2):
+                    to_step.add((ci + di, cj + dj))
+
+        changed = {}
+        for key in to_step:
+            window = self._window(key)
+            if window is None:
+                continue
+            self._scratch._board = window
+            self._scratch.step()
+            stepped = self._scratch._board
+            cells = []
+            for i in range(1, size + 1):
+                cells.extend(stepped[i * width + 1:i * width + size + 1])
+            old = self._store.get(key)
+            if old != cells and (old is not None or any(cells)):
+                changed[key] = cells
+
+        for key, cells in changed.items():
+            self._store.put(key, cells)
+        self._active = set(changed)
+
+    def close(self) -> None:
+        """
+        Removes every chunk, including the ones written to disk
+        """
+        self._store.close()
+        self._active = set()
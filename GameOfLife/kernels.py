@@ -0,0 +1,223 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# Kernels that step a Board one generation (the rules only, not the random
+# mutation).  When the first Board is made the best kernel that is
+# installed and passes a self test against the reference is picked:
+#
+#     numpy      - whole board at once with NumPy arrays
+#     table      - pure Python over the Board's flat neighbor table
+#     reference  - Board.reference_step, one count_neighbors call per cell
+#
+# Set the LIFE_KERNEL environment variable, call force_kernel or pass
+# kernel= to Board to use a specific one.
+
+import os
+import random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# name -> (priority, step function, availability check)
+_KERNELS = {}
+# Kernel picked for new boards, worked out the first time it is needed
+_default = None
+
+
+def register_kernel(name: str, step, priority: int, available=None) -> None:
+    """
+    Adds a kernel to the registry
+
+    Parameters:
+        name (str): name to select the kernel by
+        step (callable): called with a Board to step it one generation
+        priority (int): kernels with higher priority are tried first
+        available (callable): returns False if the kernel can't run here
+    """
+    _KERNELS[name] = (priority, step, available or (lambda: True))
+
+
+def available_kernels() -> list:
+    """
+    Returns:
+        (list): names of the kernels that can run here, best first
+    """
+    names = sorted(_KERNELS, key=lambda name: -_KERNELS[name][0])
+    return [name for name in names if _KERNELS[name][2]()]
+
+
+def get_kernel(name: str):
+    """
+    Looks up a kernel's step function
+
+    Parameters:
+        name (str): name of the kernel
+
+    Returns:
+        (callable): the step function
+
+    Raises:
+        ValueError: if the kernel doesn't exist or can't run here
+    """
+    if name not in _KERNELS:
+        raise ValueError('Unknown kernel ' + name + ', choose from ' + ', '.join(_KERNELS))
+    if not _KERNELS[name][2]():
+        raise ValueError('The ' + name + ' kernel is not available on this machine.')
+    return _KERNELS[name][1]
+
+
+def self_test(name: str, generations: int = 12) -> bool:
+    """
+    Checks a kernel against the reference on small random boards, bounded
+    and wrapped, without touching the random module's state
+
+    Parameters:
+        name (str): kernel to test
+        generations (int): generations to run each board for
+
+    Returns:
+        (bool): True if the kernel matched the reference every generation
+    """
+    from board import Board
+
+    rng = random.Random(163)
+    for wrap in (False, True):
+        for size in (1, 2, 3, 7, 16):
+            expected = Board(size, wrap, 'reference')
+            actual = Board(size, wrap, name)
+            for i in range(size):
+                for j in range(size):
+                    if rng.randint(1, 100) <= 35:
+                        color = rng.randint(1, 0xFFFFFF)
+                        expected.set_cell(i, j, color)
+                        actual.set_cell(i, j, color)
+            for _ in range(generations):
+                expected.step()
+                actual.step()
+                if expected.get_cells() != actual.get_cells():
+                    return False
+    return True
+
+
+def default_kernel() -> str:
+    """
+    Gets the kernel new boards use: LIFE_KERNEL if it is set, otherwise the
+    best available kernel that passes its self test
+
+    Returns:
+        (str): name of the kernel
+    """
+    global _default
+    if _default is None:
+        forced = os.environ.get('LIFE_KERNEL')
+        if forced:
+            get_kernel(forced)
+            _default = forced
+        else:
+            for name in available_kernels():
+                if name == 'reference' or self_test(name):
+                    _default = name
+                    break
+    return _default
+
+
+def force_kernel(name: str = None) -> None:
+    """
+    Makes new boards use a specific kernel
+
+    Parameters:
+        name (str): kernel to use, or None to pick the best one again
+    """
+    global _default
+    if name is not None:
+        get_kernel(name)
+    _default = name
+
+
+def reference_step(board) -> None:
+    """
+    Steps a board with Board.reference_step
+
+    Parameters:
+        board (Board): board to step
+    """
+    board.reference_step()
+
+
+def table_step(board) -> None:
+    """
+    Steps a board with its flat neighbor table.  Each live cell adds one to
+    the count of each of its neighbors, so the work grows with the number
+    of live cells, and colors are only averaged for cells being born
+
+    Parameters:
+        board (Board): board to step
+    """
+    prior = board._board
+    board._prior = prior
+    neighbors = board._neighbors
+    counts = [0] * len(prior)
+    for index, color in enumerate(prior):
+        if color:
+            for neighbor in neighbors[index]:
+                counts[neighbor] += 1
+    new_board = prior[:]
+    for index, count in enumerate(counts):
+        if count == 3:
+            r_total = g_total = b_total = 0
+            for neighbor in neighbors[index]:
+                color = prior[neighbor]
+                if color:
+                    r_total += color >> 16
+                    g_total += (color >> 8) & 0xFF
+                    b_total += color & 0xFF
+            # Rounded up like count_neighbors
+            new_board[index] = (((r_total + 2) // 3) << 16 |
+                                ((g_total + 2) // 3) << 8 | (b_total + 2) // 3)
+        elif count != 2:
+            new_board[index] = 0
+    board._board = new_board
+
+
+def numpy_step(board) -> None:
+    """
+    Steps a board with NumPy, adding up the eight shifted copies of the
+    board instead of visiting neighbors one at a time
+
+    Parameters:
+        board (Board): board to step
+    """
+    prior = board._board
+    board._prior = prior
+    cells = numpy.array(prior, dtype=numpy.int64).reshape(board.size, board.size)
+    channels = [(cells >> 16) & 0xFF, (cells >> 8) & 0xFF, cells & 0xFF]
+    alive = (cells != 0).astype(numpy.int64)
+    layers = [alive] + channels
+    totals = [numpy.zeros_like(cells) for _ in layers]
+    size = board.size
+    for x in range(-1, 2):
+        for y in range(-1, 2):
+            if x == 0 and y == 0:
+                continue
+            for total, layer in zip(totals, layers):
+                if board.wrap:
+                    # Neighbor (i + x, j + y) wraps to the other side
+                    total += numpy.roll(layer, (-x, -y), axis=(0, 1))
+                else:
+                    # Dead cells shift in from past the edges
+                    shifted = numpy.zeros_like(layer)
+                    shifted[max(0, -x):size - max(0, x), max(0, -y):size - max(0, y)] = \
+                        layer[max(0, x):size - max(0, -x), max(0, y):size - max(0, -y)]
+                    total += shifted
+    count = totals[0]
+    born = ((totals[1] + 2) // 3) << 16 | ((totals[2] + 2) // 3) << 8 | (totals[3] + 2) // 3
+    new_cells = numpy.where(count == 3, born, numpy.where(count == 2, cells, 0))
+    board._board = new_cells.ravel().tolist()
+
+
+register_kernel('numpy', numpy_step, 30, lambda: numpy is not None)
+register_kernel('table', table_step, 20)
+register_kernel('reference', reference_step, 10)
@@ -1,11 +1,20 @@
+import asyncio
+import sys
+
 from game import Game
 
 
 # Create a new Game instance
 # and start the loop
 def main():
-    g = Game()
-    g.loop()
+    # "python main.py --async" runs the asyncio version of the loop,
+    # which also writes stats to life_stats.csv
+    if '--async' in sys.argv:
+        from async_game import AsyncGame
+        asyncio.run(AsyncGame(stats_path='life_stats.csv').run())
+    else:
+        g = Game()
+        g.loop()
 
 # Check if this module is being imported or if
 # it is being run.  If it is being run, call the
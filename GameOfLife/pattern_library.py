@@ -0,0 +1,326 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# A library of Life patterns (gliders, guns, methuselahs, saved selections)
+# kept as plaintext .cells files in a directory.  Lines starting with ! are
+# comments, and "!Name:" and "!Tags:" comments give the pattern's name and
+# tags.  The other lines are the pattern itself, O for alive and . for dead.
+
+import os
+
+# Patterns that ship with the game
+PATTERN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patterns')
+
+
+class Pattern:
+    """
+    A pattern that can be stamped into a board.  Offsets are (i, j) with i
+    going across a line of the file and j going down the lines, the same
+    way Game draws a Board, so patterns show up the way they look in the
+    file.
+
+    Attributes:
+        name (str): name of the pattern
+        tags (list): tags the pattern can be looked up by
+        cells (list): (i, j) offsets of the live cells from the top left
+    """
+    def __init__(self, name: str, cells: list, tags: list = None) -> None:
+        """
+        Creates a pattern
+
+        Parameters:
+            name (str): name of the pattern
+            cells (list): (i, j) offsets of the live cells
+            tags (list): tags the pattern can be looked up by
+        """
+        self.name = name
+        self.tags = tags if tags is not None else []
+        self.cells = cells
+
+    @property
+    def width(self) -> int:
+        """
+        Returns:
+            (int): how many cells across the pattern is
+        """
+        return max((i for i, j in self.cells), default=-1) + 1
+
+    @property
+    def height(self) -> int:
+        """
+        Returns:
+            (int): how many cells down the pattern is
+        """
+        return max((j for i, j in self.cells), default=-1) + 1
+
+    def rotated(self, turns: int) -> list:
+        """
+        Gets the offsets of the pattern turned clockwise
+
+        Parameters:
+            turns (int): number of quarter turns clockwise
+
+        Returns:
+            (list): (i, j) offsets, measured from the new top left
+        """
+        cells = self.cells
+        for _ in range(turns % 4):
+            height = max(j for i, j in cells) + 1 if cells else 0
+            cells = [(height - 1 - j, i) for i, j in cells]
+        return cells
+
+    def stamp(self, board, i: int, j: int, turns: int = 0,
+              color: int = None) -> None:
+        """
+        Places the pattern on a board with its top left corner at (i, j)
+
+        Parameters:
+            board (Board): board (or InfiniteBoard) to place the pattern on
+            i (int): index of the top left corner
+            j (int): index of the top left corner
+            turns (int): number of quarter turns clockwise
+            color (int): packed color for the cells, a random one if None
+        """
+        board.stamp(self.rotated(turns), i, j, color)
+
+    def to_text(self) -> str:
+        """
+        Writes the pattern in the .cells format
+
+        Returns:
+            (str): contents of a .cells file for the pattern
+        """
+        lines = ['!Name: ' + self.name]
+        if self.tags:
+            lines.append('!Tags: ' + ', '.join(self.tags))
+        alive = set(self.cells)
+        for j in range(self.height):
+            lines.append(''.join('O' if (i, j) in alive else '.'
+                                 for i in range(self.width)))
+        return '\n'.join(lines) + '\n'
+
+
+class PatternLibrary:
+    """
+    Index of the patterns in a directory.  Only the name and tag comments
+    are read when the index is built, the first time it is needed, and a
+    pattern's cells are only read the first time it is asked for.
+
+    Attributes:
+        directory (str): directory of .cells files
+        _files (dict): pattern name to file path, None until indexed
+        _tags (dict): tag to list of pattern names
+        _loaded (dict): pattern name to Pattern for patterns already read
+    """
+    def __init__(self, directory: str = PATTERN_DIR) -> None:
+        """
+        Creates a library for a directory, without reading it yet
+
+        Parameters:
+            directory (str): directory of .cells files
+        """
+        self.directory = directory
+        self._files = None
+        self._tags = {}
+        self._loaded = {}
+
+    def _index(self) -> None:
+        """
+        Reads the name and tags of every pattern in the directory
+        """
+        if self._files is not None:
+            return
+        self._files = {}
+        self._tags = {}
+        if not os.path.isdir(self.directory):
+            return
+        for file_name in sorted(os.listdir(self.directory)):
+            if file_name.endswith('.cells'):
+                path = os.path.join(self.directory, file_name)
+                name, tags = self._read_header(path)
+                self._add(name, tags, path)
+
+    def _add(self, name: str, tags: list, path: str) -> None:
+        """
+        Puts a pattern in the name and tag index
+
+        Parameters:
+            name (str): name of the pattern
+            tags (list): tags of the pattern
+            path (str): file the pattern is in
+        """
+        self._files[name] = path
+        for tag in tags:
+            names = self._tags.setdefault(tag, [])
+            if name not in names:
+                names.append(name)
+
+    def _remove(self, name: str) -> None:
+        """
+        Takes a pattern out of the name and tag index
+
+        Parameters:
+            name (str): name of the pattern
+        """
+        del self._files[name]
+        self._loaded.pop(name, None)
+        for tag in list(self._tags):
+            if name in self._tags[tag]:
+                self._tags[tag].remove(name)
+                if not self._tags[tag]:
+                    del self._tags[tag]
+
+    @staticmethod
+    def _read_header(path: str) -> tuple[str, list]:
+        """
+        Reads the comments at the top of a .cells file
+
+        Parameters:
+            path (str): path of the file
+
+        Returns:
+            name (str): the !Name: comment, or the file name without .cells
+            tags (list): the comma separated !Tags: comment
+        """
+        name = os.path.splitext(os.path.basename(path))[0]
+        tags = []
+        with open(path) as file:
+            for line in file:
+                if not line.startswith('!'):
+                    break
+                if line.startswith('!Name:'):
+                    name = line[len('!Name:'):].strip()
+                elif line.startswith('!Tags:'):
+                    tags = [tag.strip().lower()
+                            for tag in line[len('!Tags:'):].split(',')
+                            if tag.strip()]
+        return name, tags
+
+    def names(self) -> list:
+        """
+        Returns:
+            (list): names of every pattern in the library
+        """
+        self._index()
+        return list(self._files)
+
+    def tags(self) -> list:
+        """
+        Returns:
+            (list): every tag used in the library
+        """
+        self._index()
+        return sorted(self._tags)
+
+    def tagged(self, tag: str) -> list:
+        """
+        Gets the names of the patterns with a tag
+
+        Parameters:
+            tag (str): tag to look up
+
+        Returns:
+            (list): names of the patterns with that tag
+        """
+        self._index()
+        return list(self._tags.get(tag.lower(), []))
+
+    def get(self, name: str) -> Pattern:
+        """
+        Gets a pattern, reading it from its file the first time
+
+        Parameters:
+            name (str): name of the pattern
+
+        Returns:
+            (Pattern): the pattern
+
+        Raises:
+            KeyError: if there is no pattern with that name
+        """
+        if name in self._loaded:
+            return self._loaded[name]
+        self._index()
+        path = self._files[name]
+        name, tags = self._read_header(path)
+        cells = []
+        j = 0
+        with open(path) as file:
+            for line in file:
+                if line.startswith('!'):
+                    continue
+                for i, char in enumerate(line.rstrip('\n')):
+                    if char in 'O*':
+                        cells.append((i, j))
+                j += 1
+        pattern = Pattern(name, cells, tags)
+        self._loaded[name] = pattern
+        return pattern
+
+    def save(self, pattern: Pattern, overwrite: bool = False) -> str:
+        """
+        Writes a pattern to the library's directory and adds it to the index
+
+        Parameters:
+            pattern (Pattern): pattern to save
+            overwrite (bool): True to replace a file that is already there
+
+        Returns:
+            path (str): file the pattern was written to
+
+        Raises:
+            ValueError: if the file for the pattern's name already exists
+                        and overwrite is False
+        """
+        self._index()
+        os.makedirs(self.directory, exist_ok=True)
+        file_name = ''.join(char if char.isalnum() else '_'
+                            for char in pattern.name.lower()) + '.cells'
+        path = os.path.join(self.directory, file_name)
+        if os.path.exists(path):
+            if not overwrite:
+                raise ValueError('A pattern is already saved in ' + path + ', pass overwrite=True to replace it.')
+            # The file may have held a pattern with another name that maps
+            # to the same file name
+            for name in [name for name, old_path in self._files.items() if old_path == path]:
+                self._remove(name)
+        with open(path, 'w') as file:
+            file.write(pattern.to_text())
+        self._add(pattern.name, pattern.tags, path)
+        self._loaded[pattern.name] = pattern
+        return path
+
+    def save_selection(self, name: str, board, i: int, j: int, width: int,
+                       height: int, tags: list = None, overwrite: bool = False) -> Pattern:
+        """
+        Saves the live cells in a rectangle of a board as a new pattern
+
+        Parameters:
+            name (str): name for the pattern
+            board (Board): board (or InfiniteBoard) to take the cells from
+            i (int): index of the top left corner of the selection
+            j (int): index of the top left corner of the selection
+            width (int): how many cells across (i) the selection is
+            height (int): how many cells down (j) the selection is
+            tags (list): tags for the pattern
+            overwrite (bool): True to replace a file that is already there
+
+        Returns:
+            (Pattern): the saved pattern
+
+        Raises:
+            ValueError: if the file for the name already exists and
+                        overwrite is False
+        """
+        board_cells = board.get_cells()
+        cells = [(di, dj) for di in range(width) for dj in range(height)
+                 if board_cells[i + di][j + dj]]
+        # Measures the offsets from the top left live cell
+        if cells:
+            left = min(di for di, dj in cells)
+            top = min(dj for di, dj in cells)
+            cells = sorted((di - left, dj - top) for di, dj in cells)
+        pattern = Pattern(name, cells, tags)
+        self.save(pattern, overwrite)
+        return pattern
@@ -0,0 +1,228 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# Lets one simulation publish its board into a named shared memory block
+# so any number of local viewers (viewer.py) or analysis scripts can read
+# it without pipes or copies through another process.  Writes are guarded
+# by a sequence counter (a seqlock): the writer makes it odd while writing
+# and even when done, and readers retry if it was odd or changed under them.
+#
+# Run a headless simulation that publishes with:
+#     python shared_board.py life --size 100 --wrap
+
+import argparse
+import os
+import random
+import signal
+import struct
+import sys
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+from board import Board, unpack_color
+
+# sequence, generation, board size, wrap flag
+HEADER = struct.Struct('<QQII')
+
+# Blocks created by this process, or by the process it was forked from.
+# Their names are registered with the resource tracker this process uses,
+# so a viewer attaching here must not unregister them
+_published = set()
+
+
+class BoardPublisher:
+    """
+    Owns the shared memory block and writes boards into it
+
+    Attributes:
+        name (str): name of the shared memory block
+        size (int): size of the boards that can be published
+        _shm (SharedMemory): the shared memory block
+        _sequence (int): sequence counter, odd while a write is happening
+    """
+    def __init__(self, name: str, size: int) -> None:
+        """
+        Creates the shared memory block
+
+        Parameters:
+            name (str): name viewers attach with
+            size (int): size of the boards that will be published
+        """
+        self.name = name
+        self.size = size
+        self._shm = shared_memory.SharedMemory(name=name, create=True,
+                                               size=HEADER.size + 4 * size * size)
+        _published.add(self._shm.name)
+        self._sequence = 0
+        HEADER.pack_into(self._shm.buf, 0, self._sequence, 0, size, 0)
+
+    def publish(self, board, generation: int) -> None:
+        """
+        Writes a board into the shared memory block
+
+        Parameters:
+            board (Board): board (or InfiniteBoard viewport) to publish
+            generation (int): which generation the board is on
+
+        Raises:
+            ValueError: if the board isn't the size the block was made for
+        """
+        cells = array('I')
+        for row in board.get_cells():
+            cells.extend(row)
+        if len(cells) != self.size * self.size:
+            raise ValueError('Board has ' + str(len(cells)) + ' cells, the shared memory block holds '
+                             + str(self.size * self.size) + '.')
+        wrap = 1 if getattr(board, 'wrap', False) else 0
+        buf = self._shm.buf
+        # Odd while writing so readers know to try again
+        self._sequence += 1
+        struct.pack_into('<Q', buf, 0, self._sequence)
+        buf[HEADER.size:HEADER.size + 4 * len(cells)] = cells.tobytes()
+        struct.pack_into('<QII', buf, 8, generation, self.size, wrap)
+        self._sequence += 1
+        struct.pack_into('<Q', buf, 0, self._sequence)
+
+    def close(self) -> None:
+        """
+        Removes the shared memory block; attached viewers keep their mapping
+        until they close
+        """
+        self._shm.close()
+        self._shm.unlink()
+        _published.discard(self._shm.name)
+
+
+class BoardViewer:
+    """
+    Attaches to a published board and reads consistent copies of it.  The
+    viewer never writes to the block.
+
+    Attributes:
+        name (str): name of the shared memory block
+        size (int): size of the published board
+        generation (int): generation of the last board read
+        _shm (SharedMemory): the shared memory block
+        _cells (list): size x size packed colors from the last read
+    """
+    def __init__(self, name: str) -> None:
+        """
+        Attaches to a published board
+
+        Parameters:
+            name (str): name the publisher was created with
+        """
+        self.name = name
+        # Only the publisher should remove the block when it is done, so
+        # the viewer's process must not track it
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching always registers the block.  That
+            # is only undone when this process has its own tracker; one it
+            # shares with the publisher would lose the publisher's entry
+            self._shm = shared_memory.SharedMemory(name=name)
+            if os.name == 'posix' and self._shm.name not in _published:
+                resource_tracker.unregister('/' + self._shm.name, 'shared_memory')
+        self.size = HEADER.unpack_from(self._shm.buf, 0)[2]
+        self.generation = -1
+        self._cells = [[0] * self.size for _ in range(self.size)]
+
+    def read(self, timeout: float = 1.0) -> bool:
+        """
+        Copies the latest board out of shared memory, retrying whenever the
+        publisher was part way through a write
+
+        Parameters:
+            timeout (float): seconds to keep retrying before giving up
+
+        Returns:
+            (bool): True if the board is a newer generation than last read
+
+        Raises:
+            TimeoutError: if no complete board could be read in time, which
+                          happens when the publisher died part way through
+                          a write
+        """
+        buf = self._shm.buf
+        size = self.size
+        deadline = time.monotonic() + timeout
+        while True:
+            if time.monotonic() > deadline:
+                raise TimeoutError('No complete board in ' + self.name + ' after '
+                                   + str(timeout) + ' seconds.')
+            before = struct.unpack_from('<Q', buf, 0)[0]
+            if before % 2:
+                time.sleep(0)
+                continue
+            data = bytes(buf[HEADER.size:HEADER.size + 4 * size * size])
+            generation = struct.unpack_from('<Q', buf, 8)[0]
+            if struct.unpack_from('<Q', buf, 0)[0] == before:
+                break
+        if generation == self.generation:
+            return False
+        cells = array('I')
+        cells.frombytes(data)
+        self._cells = [cells[i * size:(i + 1) * size].tolist()
+                       for i in range(size)]
+        self.generation = generation
+        return True
+
+    def get_cells(self) -> list:
+        """
+        Returns:
+            (list): size x size packed colors from the last read
+        """
+        return self._cells
+
+    def get_board(self) -> list:
+        """
+        Tuple view of the last read for the renderer
+
+        Returns:
+            (list): size x size list of lists of (r, g, b) tuples
+        """
+        return [[unpack_color(color) for color in row] for row in self._cells]
+
+    def close(self) -> None:
+        """
+        Detaches from the shared memory block
+        """
+        self._shm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Life headless and publish each generation.')
+    parser.add_argument('name', help='name of the shared memory block')
+    parser.add_argument('--size', type=int, default=20)
+    parser.add_argument('--wrap', action='store_true')
+    parser.add_argument('--density', type=int, default=20)
+    parser.add_argument('--delay', type=int, default=0, help='milliseconds between generations')
+    args = parser.parse_args()
+
+    board = Board(args.size, args.wrap)
+    for i in range(args.size):
+        for j in range(args.size):
+            if random.randint(1, 100) <= args.density:
+                board.change_color(i, j)
+    publisher = BoardPublisher(args.name, args.size)
+    # Being killed should still remove the shared memory block
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    generation = 0
+    try:
+        while True:
+            publisher.publish(board, generation)
+            board.update()
+            generation += 1
+            if args.delay:
+                time.sleep(args.delay / 1000)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+
+
+if __name__ == '__main__':
+    main()
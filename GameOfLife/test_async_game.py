@@ -0,0 +1,71 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# Checks that AsyncGame stops and reports a task's exception instead of
+# hanging, and that stats rows are written once each and in order.  Needs
+# pygame and pygame_gui; set SDL_VIDEODRIVER=dummy to run without a
+# display.  Run with:
+#     python -m unittest test_async_game
+
+import asyncio
+import csv
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+HAVE_PYGAME = all(importlib.util.find_spec(name) is not None for name in ('pygame', 'pygame_gui'))
+if HAVE_PYGAME:
+    import pygame
+    from async_game import AsyncGame
+
+
+@unittest.skipUnless(HAVE_PYGAME, 'needs pygame and pygame_gui')
+class RunTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Game loads theme.json from the working directory
+        self._cwd = os.getcwd()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+
+    def test_failing_handle_event_ends_run(self) -> None:
+        game = AsyncGame()
+        game.handle_event = mock.Mock(side_effect=KeyError('missing pattern'))
+        with mock.patch('pygame.event.get', return_value=[pygame.event.Event(pygame.MOUSEBUTTONDOWN)]):
+            with self.assertRaises(KeyError):
+                asyncio.run(asyncio.wait_for(game.run(), 5))
+
+    def test_failing_render_ends_run(self) -> None:
+        game = AsyncGame()
+        game.draw = mock.Mock(side_effect=RuntimeError('draw failed'))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(asyncio.wait_for(game.run(), 5))
+
+    def test_stats_rows_written_once_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stats.csv')
+            game = AsyncGame(fps=200, stats_path=path, stats_every=1)
+            game._running = True
+            game._delay = 0
+
+            async def play():
+                task = asyncio.create_task(game.run())
+                await asyncio.sleep(0.5)
+                game._finished = True
+                await asyncio.wait_for(task, 5)
+            asyncio.run(play())
+            with open(path, newline='') as file:
+                rows = list(csv.reader(file))
+        self.assertEqual(rows[0], ['generation', 'population', 'time'])
+        generations = [int(row[0]) for row in rows[1:]]
+        self.assertTrue(generations)
+        self.assertEqual(generations, list(range(1, len(generations) + 1)))
+        self.assertEqual(generations[-1], game._generations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# Checks that saving to a pattern library never replaces a file unless it
+# is asked to.  Run with:
+#     python -m unittest test_pattern_library
+
+import os
+import tempfile
+import unittest
+
+from pattern_library import Pattern, PatternLibrary
+
+
+class SaveTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.library = PatternLibrary(self._tempdir.name)
+        self.library.save(Pattern('Glider', [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)], ['ship']))
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def test_existing_file_is_not_overwritten(self) -> None:
+        path = os.path.join(self._tempdir.name, 'glider.cells')
+        with open(path) as file:
+            before = file.read()
+        with self.assertRaises(ValueError):
+            self.library.save(Pattern('Glider', [(0, 0)]))
+        with open(path) as file:
+            self.assertEqual(file.read(), before)
+        self.assertEqual(len(self.library.get('Glider').cells), 5)
+
+    def test_names_sharing_a_file_collide(self) -> None:
+        with self.assertRaises(ValueError):
+            self.library.save(Pattern('glider', [(0, 0)]))
+        self.assertEqual(self.library.names(), ['Glider'])
+
+    def test_overwrite_replaces_the_file(self) -> None:
+        self.library.save(Pattern('glider', [(0, 0)], ['dot']), overwrite=True)
+        self.assertEqual(self.library.names(), ['glider'])
+        self.assertEqual(self.library.tags(), ['dot'])
+        self.assertEqual(PatternLibrary(self._tempdir.name).get('glider').cells, [(0, 0)])
+
+    def test_save_selection_checks_too(self) -> None:
+        board = [[0] * 5 for _ in range(5)]
+        board[1][1] = 1
+
+        class Cells:
+            def get_cells(self):
+                return board
+        with self.assertRaises(ValueError):
+            self.library.save_selection('Glider', Cells(), 0, 0, 5, 5)
+        self.library.save_selection('Glider', Cells(), 0, 0, 5, 5, overwrite=True)
+        self.assertEqual(self.library.get('Glider').cells, [(0, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
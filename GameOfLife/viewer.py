@@ -0,0 +1,52 @@
+# Name: Clay Beal
+# Class: CIS 163
+# Professor: Woodring
+#
+# Read-only window onto a board published with shared_board.py.  Start as
+# many as you like:
+#     python viewer.py life
+
+import sys
+
+import pygame
+
+from shared_board import BoardViewer
+
+
+def main():
+    if len(sys.argv) != 2:
+        print('Usage: python viewer.py <shared memory name>')
+        return
+    viewer = BoardViewer(sys.argv[1])
+    # Cells are scaled to fit a 680 pixel square, like the 20x20 Game board
+    cell = max(1, 680 // viewer.size)
+    pygame.init()
+    screen = pygame.display.set_mode([cell * viewer.size, cell * viewer.size])
+    clock = pygame.time.Clock()
+    finished = False
+    while not finished:
+        clock.tick(60)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                finished = True
+        # Only redraw when the simulation has moved on
+        try:
+            changed = viewer.read()
+        except TimeoutError as error:
+            print(error)
+            break
+        if changed:
+            pygame.display.set_caption('Life viewer - generation ' + str(viewer.generation))
+            screen.fill((255, 255, 255))
+            board = viewer.get_board()
+            for i in range(viewer.size):
+                for j in range(viewer.size):
+                    pygame.draw.rect(screen, board[i][j],
+                                     pygame.Rect(i * cell, j * cell, max(1, cell - 2), max(1, cell - 2)))
+            pygame.display.update()
+    viewer.close()
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()